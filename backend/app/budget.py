@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Sequence, TypeVar
+
+from .utils import CHUNK_OVERLAP, CHUNK_SIZE, _chunk_ranges
+
+if TYPE_CHECKING:
+    from .config import Settings
+
+T = TypeVar("T")
+
+MIN_CHUNK_WORDS = 200
+MAX_CHUNK_WORDS = 4000
+MIN_SECTIONS = 4
+MAX_SECTIONS = 256
+# Rough offline cost of one section across all nodes; LLM-backed runs are costed from the request timeout.
+OFFLINE_SECTION_SECONDS = 0.02
+# Share of the budget planned for section work; the rest covers parsing, storage and slow requests.
+PLANNED_BUDGET_SHARE = 0.8
+MAX_SUMMARY_SENTENCES = 10
+MAX_KEYWORDS = 40
+MIN_TERMS = 4
+MAX_TERMS = 24
+# Mind-map edges per keyword; each node links to at most three later ones, so 2 keeps the cap binding.
+EDGES_PER_KEYWORD = 2
+
+
+@dataclass(frozen=True)
+class WorkPlan:
+    """How much work one analysis may do, chosen from the document size and the job time budget.
+
+    ``chunk_size`` and ``overlap`` (in words) shape the sections; ``max_sections`` caps how many of
+    them the summary node reads; the remaining limits bound the other nodes. A
+    ``time_budget_seconds`` of 0 means the job has no deadline.
+    """
+
+    word_count: int = 0
+    chunk_size: int = CHUNK_SIZE
+    overlap: int = CHUNK_OVERLAP
+    max_sections: int = MAX_SECTIONS
+    max_sentences: int = 3
+    max_keywords: int = 12
+    max_terms: int = 8
+    max_edges: int = 24
+    time_budget_seconds: float = 0.0
+
+    def to_metadata(self) -> Dict[str, str]:
+        return {
+            "plan.word_count": str(self.word_count),
+            "plan.chunk_size": str(self.chunk_size),
+            "plan.overlap": str(self.overlap),
+            "plan.max_sections": str(self.max_sections),
+            "plan.max_sentences": str(self.max_sentences),
+            "plan.max_keywords": str(self.max_keywords),
+            "plan.max_terms": str(self.max_terms),
+            "plan.max_edges": str(self.max_edges),
+            "plan.time_budget_seconds": f"{self.time_budget_seconds:g}",
+        }
+
+
+def section_cost_seconds(settings: Settings) -> float:
+    """Worst-case seconds per section: one request timeout per concurrency slot when LLM nodes are on."""
+
+    if settings.llm_enabled:
+        return settings.llm_timeout_seconds / max(1, settings.llm_max_concurrency)
+    return OFFLINE_SECTION_SECONDS
+
+
+def _overlap(chunk_size: int) -> int:
+    return chunk_size * CHUNK_OVERLAP // CHUNK_SIZE
+
+
+def _section_count(word_count: int, chunk_size: int) -> int:
+    return sum(1 for _ in _chunk_ranges(word_count, chunk_size, _overlap(chunk_size)))
+
+
+def _fit_chunk(word_count: int, sections: int) -> int:
+    """Smallest chunk size that splits ``word_count`` words into at most ``sections`` overlapping chunks."""
+
+    stride = 1 - CHUNK_OVERLAP / CHUNK_SIZE
+    chunk_size = max(1, math.ceil(word_count / (1 + stride * (sections - 1))))
+    while _section_count(word_count, chunk_size) > sections:
+        chunk_size += 1
+    return chunk_size
+
+
+def plan_work(
+    word_count: int,
+    time_budget_seconds: float,
+    section_seconds: float = OFFLINE_SECTION_SECONDS,
+    fan_in: int = MIN_SECTIONS,
+) -> WorkPlan:
+    """Pick chunking and node limits so short papers get several sections and long ones fit the budget.
+
+    Chunks start at ``CHUNK_SIZE`` words. A document that would get fewer than ``MIN_SECTIONS``
+    sections has its chunks shrunk (down to ``MIN_CHUNK_WORDS``) to get that many, but never more
+    than ``fan_in``, so the summary of a short paper stays a single flat pass. A document with more
+    sections than the budget affords has its chunks grown (up to ``MAX_CHUNK_WORDS``); sections
+    beyond that are sampled by ``sample_sections``. Section counts include the chunk overlap.
+    The summary, mind-map and glossary limits then scale with the number of sections read.
+    """
+
+    if time_budget_seconds > 0:
+        affordable = int(time_budget_seconds * PLANNED_BUDGET_SHARE / max(section_seconds, 1e-6))
+        max_sections = min(MAX_SECTIONS, max(MIN_SECTIONS, affordable))
+    else:
+        max_sections = MAX_SECTIONS
+    target = max(1, min(MIN_SECTIONS, fan_in))
+    chunk_size = CHUNK_SIZE
+    sections = _section_count(word_count, chunk_size)
+    if sections < target:
+        chunk_size = max(MIN_CHUNK_WORDS, _fit_chunk(word_count, target))
+    elif sections > max_sections:
+        chunk_size = min(MAX_CHUNK_WORDS, _fit_chunk(word_count, max_sections))
+    # Node limits grow with the sections actually read: a 4-section paper gets 3 summary
+    # sentences, 12 keywords and 8 glossary terms. Glossary definitions cost one request per
+    # term with the LLM on, so the budget caps them at a quarter of the sections it affords.
+    read = min(_section_count(word_count, chunk_size), max_sections)
+    max_keywords = min(MAX_KEYWORDS, 8 + read)
+    max_terms = min(MAX_TERMS, 4 + read)
+    if time_budget_seconds > 0:
+        max_terms = min(max_terms, max(MIN_TERMS, affordable // 4))
+    return WorkPlan(
+        word_count=word_count,
+        chunk_size=chunk_size,
+        overlap=_overlap(chunk_size),
+        max_sections=max_sections,
+        max_sentences=min(MAX_SUMMARY_SENTENCES, 2 + math.ceil(read / 4)),
+        max_keywords=max_keywords,
+        max_terms=max_terms,
+        max_edges=EDGES_PER_KEYWORD * max_keywords,
+        time_budget_seconds=max(0.0, time_budget_seconds),
+    )
+
+
+def sample_sections(sections: Sequence[T], limit: int) -> List[T]:
+    """Keep at most ``limit`` sections, evenly spaced so the first and last are always included."""
+
+    if len(sections) <= limit:
+        return list(sections)
+    if limit <= 1:
+        return list(sections[:limit])
+    step = (len(sections) - 1) / (limit - 1)
+    return [sections[round(idx * step)] for idx in range(limit)]
+
+
+def word_count(text: str) -> int:
+    return len(text.split())
+
+
+__all__ = ["WorkPlan", "plan_work", "sample_sections", "section_cost_seconds", "word_count"]
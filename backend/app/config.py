@@ -15,6 +15,24 @@ class Settings:
     max_workers: int = 2
     openai_base_url: str = "http://localhost:11434/v1"
     openai_api_key: Optional[str] = None
+    profile_enabled: bool = False
+    profile_threshold_seconds: float = 30.0
+    job_lease_seconds: float = 900.0
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 5.0
+    inline_analysis: bool = True
+    llm_enabled: bool = False
+    llm_max_concurrency: int = 4
+    llm_timeout_seconds: float = 60.0
+    llm_max_retries: int = 3
+    llm_context_tokens: int = 4096
+    llm_max_output_tokens: int = 512
+    summary_mode: str = "auto"
+    summary_fan_in: int = 4
+    job_time_budget_seconds: float = 300.0
+    maintenance_interval_seconds: float = 3600.0
+    failed_record_ttl_hours: float = 168.0
+    storage_quota_mb: int = 0
 
 
 @lru_cache
@@ -28,4 +46,29 @@ def get_settings() -> Settings:
         max_workers=int(os.getenv("PAPERHELPER_MAX_WORKERS", "2")),
         openai_base_url=os.getenv("PAPERHELPER_OPENAI_BASE_URL", "http://localhost:11434/v1"),
         openai_api_key=os.getenv("PAPERHELPER_OPENAI_API_KEY"),
+        profile_enabled=_env_flag("PAPERHELPER_PROFILE"),
+        profile_threshold_seconds=float(os.getenv("PAPERHELPER_PROFILE_THRESHOLD_SECONDS", "30")),
+        job_lease_seconds=float(os.getenv("PAPERHELPER_JOB_LEASE_SECONDS", "900")),
+        job_max_attempts=int(os.getenv("PAPERHELPER_JOB_MAX_ATTEMPTS", "3")),
+        job_retry_backoff_seconds=float(os.getenv("PAPERHELPER_JOB_RETRY_BACKOFF_SECONDS", "5")),
+        inline_analysis=_env_flag("PAPERHELPER_INLINE_ANALYSIS", default=True),
+        llm_enabled=_env_flag("PAPERHELPER_LLM_ENABLED"),
+        llm_max_concurrency=int(os.getenv("PAPERHELPER_LLM_MAX_CONCURRENCY", "4")),
+        llm_timeout_seconds=float(os.getenv("PAPERHELPER_LLM_TIMEOUT_SECONDS", "60")),
+        llm_max_retries=int(os.getenv("PAPERHELPER_LLM_MAX_RETRIES", "3")),
+        llm_context_tokens=int(os.getenv("PAPERHELPER_LLM_CONTEXT_TOKENS", "4096")),
+        llm_max_output_tokens=int(os.getenv("PAPERHELPER_LLM_MAX_OUTPUT_TOKENS", "512")),
+        summary_mode=os.getenv("PAPERHELPER_SUMMARY_MODE", "auto"),
+        summary_fan_in=int(os.getenv("PAPERHELPER_SUMMARY_FAN_IN", "4")),
+        job_time_budget_seconds=float(os.getenv("PAPERHELPER_JOB_TIME_BUDGET_SECONDS", "300")),
+        maintenance_interval_seconds=float(os.getenv("PAPERHELPER_MAINTENANCE_INTERVAL_SECONDS", "3600")),
+        failed_record_ttl_hours=float(os.getenv("PAPERHELPER_FAILED_RECORD_TTL_HOURS", "168")),
+        storage_quota_mb=int(os.getenv("PAPERHELPER_STORAGE_QUOTA_MB", "0")),
     )
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .locking import atomic_write_text, file_lock
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    LEASED = "leased"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    file_path: Path
+    priority: int = 0
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    profile: bool = False
+    enqueued_at: datetime = field(default_factory=datetime.utcnow)
+    available_at: datetime = field(default_factory=datetime.utcnow)
+    lease_owner: Optional[str] = None
+    lease_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "file_path": str(self.file_path),
+            "priority": self.priority,
+            "status": self.status.value,
+            "attempts": self.attempts,
+            "profile": self.profile,
+            "enqueued_at": self.enqueued_at.isoformat(),
+            "available_at": self.available_at.isoformat(),
+            "lease_owner": self.lease_owner,
+            "lease_id": self.lease_id,
+            "lease_expires_at": self.lease_expires_at.isoformat() if self.lease_expires_at else None,
+            "last_error": self.last_error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Job:
+        lease_expires_at = data.get("lease_expires_at")
+        return cls(
+            id=data["id"],
+            file_path=Path(data["file_path"]),
+            priority=data.get("priority", 0),
+            status=JobStatus(data.get("status", "queued")),
+            attempts=data.get("attempts", 0),
+            profile=data.get("profile", False),
+            enqueued_at=datetime.fromisoformat(data["enqueued_at"]),
+            available_at=datetime.fromisoformat(data["available_at"]),
+            lease_owner=data.get("lease_owner"),
+            lease_id=data.get("lease_id"),
+            lease_expires_at=datetime.fromisoformat(lease_expires_at) if lease_expires_at else None,
+            last_error=data.get("last_error"),
+        )
+
+    def is_ready(self, now: datetime) -> bool:
+        return self.status == JobStatus.QUEUED and self.available_at <= now
+
+    def lease_expired(self, now: datetime) -> bool:
+        return self.status == JobStatus.LEASED and self.lease_expires_at is not None and self.lease_expires_at <= now
+
+
+def _process_start(pid: int) -> str:
+    """Start time of ``pid`` in clock ticks since boot, or "" where ``/proc`` is unavailable."""
+
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii", errors="replace") as handle:
+            stat = handle.read()
+    except OSError:
+        return ""
+    # Fields after the parenthesised command name start at field 3; starttime is field 22.
+    fields = stat.rpartition(")")[2].split()
+    return fields[19] if len(fields) > 19 else ""
+
+
+def worker_identity() -> str:
+    """``host:pid:start``; the start time tells a restarted process apart from one that reused the PID."""
+
+    pid = os.getpid()
+    return f"{socket.gethostname()}:{pid}:{_process_start(pid)}"
+
+
+def _lease_abandoned(owner: Optional[str]) -> bool:
+    """Return True when the lease holder was a process on this host that no longer exists.
+
+    A live process with the holder's PID but a different start time (typically PID 1 in a
+    restarted container with the same hostname) counts as abandoned too.
+    """
+
+    host, pid, start = ((owner or "").split(":") + ["", ""])[:3]
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return bool(start) and _process_start(int(pid)) not in {"", start}
+
+
+class JobQueue:
+    """Persistent analysis queue stored as JSON next to the record store.
+
+    Every mutation runs under a file lock, so API processes and ``app.worker`` processes
+    on the same machine can share one queue.
+
+    Jobs are keyed by document id. ``lease`` hands out the ready job with the lowest
+    priority value (the upload size in bytes, so short papers run first), reduced by
+    ``aging_per_second`` for every second a job has waited so large uploads are not starved.
+    Holders extend their lease with ``renew``. ``recover`` treats a lease that expires, or whose
+    holder has exited, as a failed attempt: the job is retried with the same backoff as ``fail``
+    and fails for good after ``max_attempts``, so a document that crashes its worker cannot loop.
+    ``complete``/``fail``/``renew`` calls from a holder that has since lost the lease are ignored.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        lease_seconds: float = 900.0,
+        max_attempts: int = 3,
+        backoff_seconds: float = 5.0,
+        aging_per_second: float = 100_000.0,
+    ) -> None:
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.aging_per_second = aging_per_second
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.db_path):
+            if not self.db_path.exists():
+                self._write({})
+
+    def _read(self) -> Dict[str, dict]:
+        return json.loads(self.db_path.read_text(encoding="utf-8"))
+
+    def _write(self, data: Dict[str, dict]) -> None:
+        atomic_write_text(self.db_path, json.dumps(data, separators=(",", ":")))
+
+    def enqueue(
+        self, job_id: str, file_path: Path, priority: int = 0, profile: bool = False, now: Optional[datetime] = None
+    ) -> Job:
+        now = now or datetime.utcnow()
+        job = Job(id=job_id, file_path=file_path, priority=priority, profile=profile, enqueued_at=now, available_at=now)
+        with file_lock(self.db_path):
+            data = self._read()
+            data[job.id] = job.to_dict()
+            self._write(data)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        payload = self._read().get(job_id)
+        return Job.from_dict(payload) if payload else None
+
+    def list_jobs(self) -> List[Job]:
+        return [Job.from_dict(payload) for payload in self._read().values()]
+
+    def lease(self, worker_id: str, now: Optional[datetime] = None) -> Optional[Job]:
+        now = now or datetime.utcnow()
+        with file_lock(self.db_path):
+            data = self._read()
+            ready = [job for job in (Job.from_dict(payload) for payload in data.values()) if job.is_ready(now)]
+            if not ready:
+                return None
+            job = min(ready, key=lambda item: (self._effective_priority(item, now), item.enqueued_at))
+            job.status = JobStatus.LEASED
+            job.attempts += 1
+            job.lease_owner = worker_id
+            job.lease_id = uuid.uuid4().hex
+            job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+            data[job.id] = job.to_dict()
+            self._write(data)
+        return job
+
+    def _effective_priority(self, job: Job, now: datetime) -> float:
+        return job.priority - self.aging_per_second * max(0.0, (now - job.enqueued_at).total_seconds())
+
+    @staticmethod
+    def _held(job: Job, lease_id: Optional[str]) -> bool:
+        return lease_id is None or (job.status == JobStatus.LEASED and job.lease_id == lease_id)
+
+    def renew(self, job_id: str, lease_id: str, now: Optional[datetime] = None) -> bool:
+        """Extend a lease by ``lease_seconds``; return False when ``lease_id`` no longer holds the job."""
+
+        now = now or datetime.utcnow()
+        with file_lock(self.db_path):
+            data = self._read()
+            if job_id not in data:
+                return False
+            job = Job.from_dict(data[job_id])
+            if not self._held(job, lease_id):
+                return False
+            job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+            data[job_id] = job.to_dict()
+            self._write(data)
+        return True
+
+    def complete(self, job_id: str, lease_id: Optional[str] = None) -> None:
+        with file_lock(self.db_path):
+            data = self._read()
+            if job_id not in data:
+                return
+            job = Job.from_dict(data[job_id])
+            if not self._held(job, lease_id):
+                return
+            job.status = JobStatus.COMPLETED
+            job.lease_owner = None
+            job.lease_id = None
+            job.lease_expires_at = None
+            job.last_error = None
+            data[job_id] = job.to_dict()
+            self._write(data)
+
+    def fail(
+        self, job_id: str, error: str, now: Optional[datetime] = None, lease_id: Optional[str] = None
+    ) -> Optional[Job]:
+        """Record a failed attempt; the job is retried with exponential backoff until ``max_attempts``.
+
+        Returns None when the job is gone or ``lease_id`` no longer holds it.
+        """
+
+        now = now or datetime.utcnow()
+        with file_lock(self.db_path):
+            data = self._read()
+            if job_id not in data:
+                return None
+            job = Job.from_dict(data[job_id])
+            if not self._held(job, lease_id):
+                return None
+            self._release(job, error, now)
+            data[job_id] = job.to_dict()
+            self._write(data)
+        return job
+
+    def _release(self, job: Job, error: str, now: datetime) -> None:
+        """End ``job``'s lease as a failed attempt: back off and requeue, or fail after ``max_attempts``."""
+
+        job.last_error = error
+        job.lease_owner = None
+        job.lease_id = None
+        job.lease_expires_at = None
+        if job.attempts >= self.max_attempts:
+            job.status = JobStatus.FAILED
+        else:
+            job.status = JobStatus.QUEUED
+            delay = self.backoff_seconds * (2 ** (job.attempts - 1))
+            job.available_at = now + timedelta(seconds=delay)
+
+    def recover(self, now: Optional[datetime] = None) -> List[Job]:
+        """Fail the attempts of expired or abandoned leases, e.g. after a crash or restart.
+
+        Returns the released jobs; those that reached ``max_attempts`` come back ``FAILED``.
+        """
+
+        now = now or datetime.utcnow()
+        recovered: List[Job] = []
+        with file_lock(self.db_path):
+            data = self._read()
+            for payload in data.values():
+                job = Job.from_dict(payload)
+                if job.status != JobStatus.LEASED:
+                    continue
+                if not job.lease_expired(now) and not _lease_abandoned(job.lease_owner):
+                    continue
+                self._release(job, f"Lease held by {job.lease_owner} expired or its worker exited", now)
+                data[job.id] = job.to_dict()
+                recovered.append(job)
+            if recovered:
+                self._write(data)
+        return recovered
+
+    def remove(self, job_ids: Iterable[str]) -> int:
+        """Drop jobs by id; leased jobs are kept so a running worker can still report back."""
+
+        job_ids = set(job_ids)
+        with file_lock(self.db_path):
+            data = self._read()
+            removed = [
+                job_id
+                for job_id, payload in data.items()
+                if job_id in job_ids and payload.get("status") != JobStatus.LEASED.value
+            ]
+            for job_id in removed:
+                del data[job_id]
+            if removed:
+                self._write(data)
+        return len(removed)
+
+    def compact(self) -> int:
+        """Rewrite the queue in compact form; return the bytes saved."""
+
+        with file_lock(self.db_path):
+            before = self.db_path.stat().st_size
+            self._write(self._read())
+            return max(0, before - self.db_path.stat().st_size)
+
+    def has_ready(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.utcnow()
+        data = self._read()
+        return any(Job.from_dict(payload).is_ready(now) for payload in data.values())
+
+    def depth(self) -> int:
+        return self.counts().get(JobStatus.QUEUED, 0)
+
+    def counts(self) -> Dict[JobStatus, int]:
+        counts: Dict[JobStatus, int] = {}
+        for payload in self._read().values():
+            status = JobStatus(payload.get("status", "queued"))
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+__all__ = ["Job", "JobQueue", "JobStatus", "worker_identity"]
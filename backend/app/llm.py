@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .locking import atomic_write_text
+from .metrics import registry
+
+if TYPE_CHECKING:
+    import http.client
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    from .config import Settings
+
+CacheKey = Tuple[str, str]
+
+# ``time.perf_counter()`` value after which requests made in this context are abandoned.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_deadline", default=None)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+registry.describe("paperhelper_llm_request_seconds", "histogram", "Latency of LLM HTTP requests.")
+registry.describe("paperhelper_llm_requests_total", "counter", "LLM HTTP requests, by outcome.")
+registry.describe("paperhelper_llm_cache_hits_total", "counter", "LLM completions served from the response cache.")
+registry.describe(
+    "paperhelper_llm_coalesced_total", "counter", "LLM completions shared with an identical request already in flight."
+)
+
+
+class LLMError(Exception):
+    """Raised when a completion cannot be obtained from the model endpoint."""
+
+
+class _RetryableError(Exception):
+    pass
+
+
+class _DeadlineError(LLMError):
+    """The caller's deadline passed before a completion arrived."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt packing."""
+
+    return max(1, len(text) // 4)
+
+
+def pack_chunks(items: Sequence[str], token_budget: int, separator: str = "\n\n") -> List[str]:
+    """Greedily join consecutive items into chunks that fit ``token_budget``.
+
+    Items larger than the budget on their own are truncated so every chunk fits a single request.
+    """
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    separator_tokens = estimate_tokens(separator)
+    for item in items:
+        item_tokens = estimate_tokens(item)
+        if item_tokens > token_budget:
+            item = item[: token_budget * 4]
+            item_tokens = token_budget
+        extra = item_tokens + (separator_tokens if current else 0)
+        if current and current_tokens + extra > token_budget:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+            extra = item_tokens
+        current.append(item)
+        current_tokens += extra
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def prompt_hash(prompt: str, system: Optional[str] = None) -> str:
+    return hashlib.sha256(f"{system or ''}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU cache of completions keyed by ``(model, prompt hash)``, optionally mirrored to disk."""
+
+    def __init__(self, directory: Optional[Path] = None, max_entries: int = 1024) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: CacheKey) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        model, digest = key
+        model_digest = hashlib.sha256(model.encode("utf-8")).hexdigest()[:12]
+        return self.directory / f"{model_digest}-{digest}.txt"
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            value = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            # Missing, or evicted by storage maintenance since it was written.
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key: CacheKey, value: str) -> None:
+        self._remember(key, value)
+        path = self._path(key)
+        if path is not None:
+            atomic_write_text(path, value)
+
+    def _remember(self, key: CacheKey, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP connections to one endpoint; the pool size bounds concurrent requests."""
+
+    def __init__(self, base_url: str, size: int, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.path_prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, size))
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        import http.client
+
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[http.client.HTTPConnection]:
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._new_connection()
+            conn.timeout = self.timeout if timeout is None else timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(conn.timeout)
+            try:
+                yield conn
+            except BaseException:
+                conn.close()
+                raise
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class LLMClient:
+    """Client for OpenAI-compatible ``/chat/completions`` endpoints.
+
+    One client is meant to be shared by every node and document in a process: its connection
+    pool bounds concurrency globally, ``complete_many`` fans prompts out over that pool, and
+    identical prompts are answered from the response cache. Chat completions take one prompt
+    per request, so concurrent documents are batched by sharing the pool and by coalescing
+    identical prompts that are already in flight into a single request.
+
+    Requests made inside ``with client.deadline(when):`` are bounded by that deadline: each
+    request's timeout and retry backoff are clamped to the time left, and once it has passed
+    requests, including the rest of a ``complete_many`` batch, fail with ``LLMError``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 4,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        context_tokens: int = 4096,
+        max_output_tokens: int = 512,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.context_tokens = context_tokens
+        self.max_output_tokens = max_output_tokens
+        self.cache = cache if cache is not None else ResponseCache()
+        self._pool = _ConnectionPool(base_url, self.max_concurrency, timeout)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._inflight: Dict[CacheKey, Future[str]] = {}
+        self._inflight_lock = threading.Lock()
+
+    @property
+    def prompt_token_budget(self) -> int:
+        """Tokens available for packed content once instructions and the response are accounted for."""
+
+        return max(256, self.context_tokens - self.max_output_tokens - 256)
+
+    @contextmanager
+    def deadline(self, when: Optional[float]) -> Iterator[None]:
+        """Bound requests made in this context (and ``complete_many`` workers it starts) by ``when``."""
+
+        token = _deadline.set(when)
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    def _remaining(self) -> Optional[float]:
+        """Seconds left before the current deadline, or None without one; raises once it has passed."""
+
+        when = _deadline.get()
+        if when is None:
+            return None
+        remaining = when - time.perf_counter()
+        if remaining <= 0:
+            raise _DeadlineError("LLM deadline passed")
+        return remaining
+
+    def complete(self, prompt: str, system: Optional[str] = None) -> str:
+        key = (self.model, prompt_hash(prompt, system))
+        cached = self.cache.get(key)
+        if cached is not None:
+            registry.inc("paperhelper_llm_cache_hits_total")
+            return cached
+        from concurrent.futures import Future
+
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                owned = self._inflight[key] = Future()
+        if pending is not None:
+            registry.inc("paperhelper_llm_coalesced_total")
+            from concurrent.futures import TimeoutError as FutureTimeoutError
+
+            remaining = self._remaining()
+            try:
+                return pending.result(timeout=remaining)
+            except FutureTimeoutError:
+                raise _DeadlineError("LLM deadline passed while waiting for an identical request") from None
+            except _DeadlineError:
+                # The shared request was cut off by its sender's deadline, not ours.
+                return self.complete(prompt, system)
+        try:
+            text = self._request(prompt, system)
+            self.cache.put(key, text)
+        except BaseException as exc:
+            owned.set_exception(exc)
+            raise
+        else:
+            owned.set_result(text)
+            return text
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _request(self, prompt: str, system: Optional[str]) -> str:
+        messages: List[Dict[str, str]] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_output_tokens,
+            "temperature": 0,
+        }
+        return self._post_with_retries(payload)
+
+    def complete_many(self, prompts: Sequence[str], system: Optional[str] = None) -> List[str]:
+        """Complete ``prompts`` concurrently (bounded by the pool), sending each distinct prompt once."""
+
+        unique = list(dict.fromkeys(prompts))
+        if len(unique) <= 1:
+            results = {prompt: self.complete(prompt, system) for prompt in unique}
+        else:
+            executor = self._get_executor()
+            # Workers run in a copy of this context so they see the caller's deadline.
+            futures = {
+                prompt: executor.submit(contextvars.copy_context().run, self.complete, prompt, system)
+                for prompt in unique
+            }
+            try:
+                results = {prompt: future.result() for prompt, future in futures.items()}
+            except BaseException:
+                for future in futures.values():
+                    future.cancel()
+                raise
+        return [results[prompt] for prompt in prompts]
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self._pool.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm")
+            return self._executor
+
+    def _post_with_retries(self, payload: Dict[str, Any]) -> str:
+        for attempt in range(self.max_retries + 1):
+            remaining = self._remaining()
+            try:
+                with registry.timer("paperhelper_llm_request_seconds"):
+                    text = self._post(payload, self.timeout if remaining is None else min(self.timeout, remaining))
+            except _RetryableError as exc:
+                registry.inc("paperhelper_llm_requests_total", outcome="retryable_error")
+                if attempt == self.max_retries:
+                    raise LLMError(f"LLM request failed after {attempt + 1} attempts: {exc}") from exc
+                delay = self.backoff_seconds * (2**attempt)
+                remaining = self._remaining()
+                if remaining is not None and remaining <= delay:
+                    raise _DeadlineError(f"LLM deadline left no time to retry after {attempt + 1} attempts") from exc
+                time.sleep(delay)
+            except LLMError:
+                registry.inc("paperhelper_llm_requests_total", outcome="error")
+                raise
+            else:
+                registry.inc("paperhelper_llm_requests_total", outcome="ok")
+                return text
+        raise LLMError("LLM request failed")  # pragma: no cover - loop always returns or raises
+
+    def _post(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        import http.client
+
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        with self._pool.connection(timeout) as conn:
+            try:
+                conn.request("POST", f"{self._pool.path_prefix}/chat/completions", body=body, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                raise _RetryableError(str(exc)) from exc
+        if response.status in RETRYABLE_STATUS:
+            raise _RetryableError(f"HTTP {response.status}")
+        if response.status >= 400:
+            raise LLMError(f"HTTP {response.status}: {raw[:200].decode('utf-8', errors='replace')}")
+        try:
+            return json.loads(raw)["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as exc:
+            raise LLMError("Malformed completion response") from exc
+
+
+_clients: Dict[Tuple[Any, ...], LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(settings: Settings) -> Optional[LLMClient]:
+    """Return the process-wide client for ``settings``, or None when LLM-backed nodes are disabled."""
+
+    if not settings.llm_enabled:
+        return None
+    key = (
+        settings.openai_base_url,
+        settings.model_name,
+        settings.openai_api_key,
+        settings.llm_max_concurrency,
+        settings.llm_timeout_seconds,
+        settings.llm_max_retries,
+        settings.llm_context_tokens,
+        settings.llm_max_output_tokens,
+        settings.storage_path,
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = LLMClient(
+                base_url=settings.openai_base_url,
+                model=settings.model_name,
+                api_key=settings.openai_api_key,
+                max_concurrency=settings.llm_max_concurrency,
+                timeout=settings.llm_timeout_seconds,
+                max_retries=settings.llm_max_retries,
+                context_tokens=settings.llm_context_tokens,
+                max_output_tokens=settings.llm_max_output_tokens,
+                cache=ResponseCache(settings.storage_path / "llm-cache"),
+            )
+    return client
+
+
+__all__ = ["LLMClient", "LLMError", "ResponseCache", "estimate_tokens", "get_llm_client", "pack_chunks"]
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 
+import json
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
 from fastapi import BackgroundTasks, Depends, FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse
 
 from .config import Settings, get_settings
+from .jobs import JobStatus
+from .maintenance import start_maintenance
+from .metrics import registry
 from .models import DocumentArtifacts, DocumentRecord, DocumentStatus
-from .storage import StorageManager
-from .utils import ParsedDocument, generate_document_id, load_document
-from .workflow.nodes import PaperAnalysisWorkflow, WorkflowState
+from .pipeline import ApplicationContext, drain_jobs, recover_jobs
+from .profiling import PROFILE_REPORT_FILENAME
+from .utils import generate_document_id, validate_document
 
 app = FastAPI(title="PaperHelper API", version="0.1.0")
 app.add_middleware(
@@ -23,16 +29,13 @@ app.add_middleware(
 )
 
 
-class ApplicationContext:
-    def __init__(self, settings: Settings) -> None:
-        self.settings = settings
-        self.storage = StorageManager(settings.storage_path / "paperhelper.json")
-        self.workflow = PaperAnalysisWorkflow()
-
-
 @app.on_event("startup")
 async def startup_event() -> None:
-    get_settings()
+    context = ApplicationContext(get_settings())
+    if recover_jobs(context) and context.settings.inline_analysis:
+        threading.Thread(target=drain_jobs, args=(context,), daemon=True).start()
+    if context.settings.maintenance_interval_seconds > 0:
+        start_maintenance(context)
 
 
 def get_context(settings: Settings = Depends(get_settings)) -> ApplicationContext:
@@ -59,43 +62,11 @@ def _persist_uploaded_file(upload: UploadFile, storage_dir: Path) -> Path:
     return file_path
 
 
-def _process_document(doc_id: str, parsed: ParsedDocument, context: ApplicationContext) -> DocumentArtifacts:
-    state = WorkflowState(document_id=doc_id, filename=doc_id, sections=parsed.sections)
-    return context.workflow.run(state)
-
-
-def _store_artifacts(doc_id: str, artifacts: DocumentArtifacts, context: ApplicationContext) -> None:
-    record = context.storage.get_record(doc_id)
-    if not record:
-        raise RuntimeError(f"Document {doc_id} not found for storage update")
-    record.status = DocumentStatus.COMPLETED
-    record.artifacts = artifacts
-    context.storage.save_record(record)
-
-
-def _update_record_status(doc_id: str, status: DocumentStatus, context: ApplicationContext, error: str | None = None) -> None:
-    record = context.storage.get_record(doc_id)
-    if not record:
-        return
-    record.status = status
-    record.error = error
-    context.storage.save_record(record)
-
-
-async def _analyze_document(doc_id: str, file_path: Path, context: ApplicationContext) -> None:
-    try:
-        parsed = load_document(file_path)
-        artifacts = _process_document(doc_id, parsed, context)
-        _store_artifacts(doc_id, artifacts, context)
-    except Exception as exc:  # noqa: BLE001
-        _update_record_status(doc_id, DocumentStatus.FAILED, context, error=str(exc))
-        raise
-
-
 @app.post("/api/documents")
 async def upload_document(
     background: BackgroundTasks,
     file: UploadFile = File(...),
+    profile: bool = False,
     context: ApplicationContext = Depends(get_context),
 ) -> DocumentRecord:
     if not file.filename:
@@ -103,17 +74,20 @@ async def upload_document(
     doc_id = generate_document_id()
     storage_dir = context.settings.storage_path / doc_id
     file_path = _persist_uploaded_file(file, storage_dir)
-    parsed = load_document(file_path)
+    # Text extraction runs with the analysis job, so the API process never loads the PDF parser.
+    validate_document(file_path)
 
     record = DocumentRecord(
         id=doc_id,
         filename=file_path.name,
         storage_path=file_path,
         status=DocumentStatus.PROCESSING,
-        metadata={"content_length": str(len(parsed.text))},
     )
     context.storage.save_record(record)
-    background.add_task(_analyze_document, doc_id, file_path, context)
+    context.jobs.enqueue(doc_id, file_path, priority=file_path.stat().st_size, profile=profile)
+    registry.set_gauge("paperhelper_jobs_queued", context.jobs.depth())
+    if context.settings.inline_analysis:
+        background.add_task(drain_jobs, context)
     return record
 
 
@@ -133,6 +107,76 @@ async def get_mindmap(doc_id: str, context: ApplicationContext = Depends(get_con
     return record.artifacts
 
 
+@app.get("/api/documents/{doc_id}/similar")
+async def get_similar_documents(
+    doc_id: str, limit: int = 10, context: ApplicationContext = Depends(get_context)
+) -> List[Dict[str, Any]]:
+    if context.vectors.get(doc_id) is None:
+        raise HTTPException(status_code=404, detail="Document vector not available")
+    hits = context.vectors.most_similar(doc_id, limit=limit)
+    filenames = context.storage.filenames(other_id for other_id, _ in hits)
+    return [
+        {"id": other_id, "filename": filenames[other_id], "score": round(score, 6)}
+        for other_id, score in hits
+        if other_id in filenames
+    ]
+
+
+SNIPPET_DEFAULT_BYTES = 4096
+SNIPPET_MAX_BYTES = 65536
+
+
+@app.get("/api/documents/{doc_id}/text")
+async def get_document_text(
+    doc_id: str, start: int = 0, end: Optional[int] = None, context: ApplicationContext = Depends(get_context)
+) -> Dict[str, Any]:
+    if not context.texts.has(doc_id):
+        raise HTTPException(status_code=404, detail="Document text not available")
+    if start < 0 or (end is not None and end < start):
+        raise HTTPException(status_code=400, detail="Expected 0 <= start <= end")
+    if end is None:
+        end = start + SNIPPET_DEFAULT_BYTES
+    start, end, text = context.texts.read(doc_id, start, min(end, start + SNIPPET_MAX_BYTES))
+    return {"id": doc_id, "start": start, "end": end, "total": context.texts.size(doc_id), "text": text}
+
+
+@app.get("/api/documents/{doc_id}/text/index")
+async def get_document_text_index(doc_id: str, context: ApplicationContext = Depends(get_context)) -> Dict[str, Any]:
+    index = context.texts.index(doc_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Document text not available")
+    return index
+
+
+@app.get("/api/clusters")
+async def list_clusters(context: ApplicationContext = Depends(get_context)) -> Dict[str, Any]:
+    clusters_path = context.settings.storage_path / "clusters.json"
+    if not clusters_path.exists():
+        raise HTTPException(status_code=404, detail="Corpus has not been clustered yet")
+    result = json.loads(clusters_path.read_text(encoding="utf-8"))
+    result.pop("assignments", None)
+    return result
+
+
+@app.get("/api/admin/documents/{doc_id}/profile", response_class=FileResponse)
+async def download_profile(
+    doc_id: str, format: str = "pstats", context: ApplicationContext = Depends(get_context)
+) -> FileResponse:
+    record = context.storage.get_record(doc_id)
+    if not record or "profile_path" not in record.metadata:
+        raise HTTPException(status_code=404, detail="Profile not available")
+    if format not in {"pstats", "text"}:
+        raise HTTPException(status_code=400, detail="Format must be 'pstats' or 'text'")
+    profile_path = Path(record.metadata["profile_path"])
+    if format == "text":
+        profile_path = profile_path.with_name(PROFILE_REPORT_FILENAME)
+    if not profile_path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not available")
+    if format == "text":
+        return FileResponse(profile_path, media_type="text/plain", filename=f"{doc_id}.txt")
+    return FileResponse(profile_path, media_type="application/octet-stream", filename=f"{doc_id}.pstats")
+
+
 @app.get("/api/documents")
 async def list_documents(context: ApplicationContext = Depends(get_context)) -> Dict[str, DocumentRecord]:
     return context.storage.list_records()
@@ -143,6 +187,15 @@ async def health_check() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(context: ApplicationContext = Depends(get_context)) -> PlainTextResponse:
+    # Analyses may run in separate worker processes, so queue gauges are read from the shared queue.
+    counts = context.jobs.counts()
+    registry.set_gauge("paperhelper_jobs_queued", counts.get(JobStatus.QUEUED, 0))
+    registry.set_gauge("paperhelper_jobs_leased", counts.get(JobStatus.LEASED, 0))
+    return PlainTextResponse(registry.render())
+
+
 if __name__ == "__main__":  # pragma: no cover
     import uvicorn
 
@@ -0,0 +1,224 @@
+"""Storage retention and garbage collection.
+
+Runs on a timer inside the API process (``PAPERHELPER_MAINTENANCE_INTERVAL_SECONDS``) or
+on demand with ``python -m app.maintenance``. Each pass:
+
+* deletes failed documents older than ``PAPERHELPER_FAILED_RECORD_TTL_HOURS``, together
+  with their upload directory, job and vector;
+* drops finished jobs, orphaned document directories and vectors, and stale temp files;
+* rewrites the record store and job queue in compact form;
+* evicts the least recently used cache files once the storage directory exceeds
+  ``PAPERHELPER_STORAGE_QUOTA_MB``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+from .jobs import JobStatus
+from .metrics import registry
+from .models import DocumentStatus
+
+if TYPE_CHECKING:
+    from .pipeline import ApplicationContext
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIRECTORIES = ("summary-cache", "llm-cache")
+# Uploads create their directory before the record is saved; younger directories are left alone.
+ORPHAN_GRACE_SECONDS = 3600.0
+DOCUMENT_DIR_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+registry.describe("paperhelper_maintenance_reclaimed_bytes_total", "counter", "Bytes freed by storage maintenance.")
+registry.describe("paperhelper_storage_used_bytes", "gauge", "Storage directory size after the last maintenance run.")
+
+
+@dataclass
+class MaintenanceReport:
+    records_removed: int = 0
+    jobs_removed: int = 0
+    vectors_removed: int = 0
+    orphans_removed: int = 0
+    temp_files_removed: int = 0
+    cache_files_evicted: int = 0
+    bytes_reclaimed: int = 0
+    bytes_used: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _tree_size(path: Path) -> int:
+    if not path.exists():
+        return 0
+    if path.is_file():
+        return path.stat().st_size
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                continue
+    return total
+
+
+def _remove_tree(path: Path) -> int:
+    size = _tree_size(path)
+    shutil.rmtree(path, ignore_errors=True)
+    return size
+
+
+def _document_dirs(root: Path) -> Iterator[Path]:
+    for entry in root.iterdir():
+        if entry.is_dir() and DOCUMENT_DIR_PATTERN.fullmatch(entry.name):
+            yield entry
+
+
+def _cache_files(root: Path) -> List[Tuple[float, int, Path]]:
+    """Cache files as ``(last_used, size, path)``; last use is the later of access and modification time."""
+
+    files = []
+    for name in CACHE_DIRECTORIES:
+        directory = root / name
+        if not directory.is_dir():
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, Path(entry.path)))
+    return files
+
+
+def run_maintenance(
+    context: ApplicationContext,
+    failed_ttl_hours: Optional[float] = None,
+    quota_mb: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> MaintenanceReport:
+    settings = context.settings
+    root = settings.storage_path
+    failed_ttl_hours = settings.failed_record_ttl_hours if failed_ttl_hours is None else failed_ttl_hours
+    quota_mb = settings.storage_quota_mb if quota_mb is None else quota_mb
+    now = now or datetime.utcnow()
+    started = time.perf_counter()
+    report = MaintenanceReport()
+
+    records = context.storage.list_records()
+    cutoff = now - timedelta(hours=failed_ttl_hours)
+    expired = [
+        doc_id
+        for doc_id, record in records.items()
+        if record.status == DocumentStatus.FAILED and record.uploaded_at < cutoff
+    ]
+    report.records_removed = context.storage.delete_records(expired)
+    for doc_id in expired:
+        report.bytes_reclaimed += _remove_tree(root / doc_id)
+
+    # Uploads keep arriving during the pass, so ``records`` is only trusted for what it deleted:
+    # queued jobs are dropped only for expired records, and vectors are compared with records
+    # read after the vector ids, since a vector is always written after its record.
+    finished = {JobStatus.COMPLETED, JobStatus.FAILED}
+    stale_jobs = [job.id for job in context.jobs.list_jobs() if job.status in finished or job.id in expired]
+    report.jobs_removed = context.jobs.remove(stale_jobs)
+
+    vector_ids = set(context.vectors.ids())
+    records = context.storage.list_records()
+    report.vectors_removed = context.vectors.remove(vector_ids - set(records))
+    report.bytes_reclaimed += report.vectors_removed * context.vectors.row_bytes
+
+    grace_cutoff = time.time() - ORPHAN_GRACE_SECONDS
+    for directory in _document_dirs(root):
+        if directory.name not in records and directory.stat().st_mtime < grace_cutoff:
+            report.bytes_reclaimed += _remove_tree(directory)
+            report.orphans_removed += 1
+
+    # atomic_write_text leaves ``*.tmp`` files behind only when a writer dies mid-write.
+    for tmp_path in root.rglob("*.tmp"):
+        try:
+            stat = tmp_path.stat()
+            if stat.st_mtime < grace_cutoff:
+                tmp_path.unlink()
+                report.bytes_reclaimed += stat.st_size
+                report.temp_files_removed += 1
+        except FileNotFoundError:
+            continue
+
+    report.bytes_reclaimed += context.storage.compact()
+    report.bytes_reclaimed += context.jobs.compact()
+
+    report.bytes_used = _tree_size(root)
+    quota_bytes = quota_mb * 1024 * 1024
+    if quota_bytes and report.bytes_used > quota_bytes:
+        for _, size, path in sorted(_cache_files(root)):
+            if report.bytes_used <= quota_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            report.bytes_used -= size
+            report.bytes_reclaimed += size
+            report.cache_files_evicted += 1
+        if report.bytes_used > quota_bytes:
+            logger.warning("Storage uses %d bytes after evicting caches; quota is %d", report.bytes_used, quota_bytes)
+
+    report.seconds = time.perf_counter() - started
+    registry.inc("paperhelper_maintenance_reclaimed_bytes_total", report.bytes_reclaimed)
+    registry.set_gauge("paperhelper_storage_used_bytes", report.bytes_used)
+    return report
+
+
+def start_maintenance(context: ApplicationContext, stop: Optional[threading.Event] = None) -> threading.Thread:
+    """Run ``run_maintenance`` every ``maintenance_interval_seconds`` on a daemon thread until ``stop`` is set."""
+
+    stop = stop or threading.Event()
+    interval = context.settings.maintenance_interval_seconds
+
+    def _loop() -> None:
+        while not stop.wait(interval):
+            try:
+                report = run_maintenance(context)
+            except Exception:  # noqa: BLE001
+                logger.exception("Storage maintenance failed")
+                continue
+            logger.info("Storage maintenance reclaimed %d bytes", report.bytes_reclaimed)
+
+    thread = threading.Thread(target=_loop, name="storage-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .config import get_settings
+    from .pipeline import ApplicationContext
+
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance", description="Compact and prune storage.")
+    parser.add_argument("--failed-ttl-hours", type=float, help="Override PAPERHELPER_FAILED_RECORD_TTL_HOURS.")
+    parser.add_argument("--quota-mb", type=int, help="Override PAPERHELPER_STORAGE_QUOTA_MB (0 disables).")
+    args = parser.parse_args(argv)
+
+    report = run_maintenance(
+        ApplicationContext(get_settings()), failed_ttl_hours=args.failed_ttl_hours, quota_mb=args.quota_mb
+    )
+    print(json.dumps(report.to_dict(), indent=2))
+    return 0
+
+
+__all__ = ["MaintenanceReport", "run_maintenance", "start_maintenance"]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
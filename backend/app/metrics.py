@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+@dataclass
+class _Histogram:
+    buckets: Tuple[float, ...]
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+
+
+class MetricsRegistry:
+    """Thread-safe in-process metrics rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        with self._lock:
+            self._types[name] = metric_type
+            self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def add_gauge(self, name: str, delta: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + delta
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[Dict[str, float]]:
+        """Observe the duration of the block; the elapsed seconds are exposed via ``result["seconds"]``."""
+
+        result: Dict[str, float] = {}
+        start = time.perf_counter()
+        try:
+            yield result
+        finally:
+            result["seconds"] = time.perf_counter() - start
+            self.observe(name, result["seconds"], **labels)
+
+    def value(self, name: str, **labels: str) -> float:
+        key = _label_key(labels)
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if name in store and key in store[name]:
+                    return store[name][key]
+            histogram = self._histograms.get(name, {}).get(key)
+        return float(histogram.count) if histogram else 0.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            observed = set(self._counters) | set(self._gauges) | set(self._histograms)
+            for name in sorted(set(self._types) - observed):
+                lines.extend(self._header(name, self._types[name]))
+            for store, default_type in ((self._counters, "counter"), (self._gauges, "gauge")):
+                for name in sorted(store):
+                    lines.extend(self._header(name, default_type))
+                    for key, value in sorted(store[name].items()):
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name in sorted(self._histograms):
+                lines.extend(self._header(name, "histogram"))
+                for key, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        bucket_key = key + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_key)} {count}")
+                    inf_key = key + (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_format_labels(inf_key)} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, default_type: str) -> List[str]:
+        header: List[str] = []
+        if name in self._help:
+            header.append(f"# HELP {name} {self._help[name]}")
+        header.append(f"# TYPE {name} {self._types.get(name, default_type)}")
+        return header
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = (f'{name}="{_escape(value)}"' for name, value in key)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+registry.describe("paperhelper_stage_seconds", "histogram", "Latency of individual workflow stages.")
+registry.describe("paperhelper_parse_seconds", "histogram", "Latency of document text extraction and chunking.")
+registry.describe("paperhelper_parsed_bytes_total", "counter", "Bytes of source documents parsed.")
+registry.describe("paperhelper_storage_seconds", "histogram", "Latency of record store operations.")
+registry.describe("paperhelper_storage_bytes_total", "counter", "Bytes read from and written to the record store.")
+registry.describe("paperhelper_document_seconds", "histogram", "End-to-end analysis latency per document.")
+registry.describe("paperhelper_documents_total", "counter", "Documents analyzed, by final status.")
+registry.describe("paperhelper_jobs_queued", "gauge", "Analyses accepted but not yet started.")
+registry.describe("paperhelper_jobs_in_flight", "gauge", "Analyses currently running in this process.")
+registry.describe("paperhelper_jobs_leased", "gauge", "Jobs leased by any worker sharing the queue.")
+
+
+__all__ = ["MetricsRegistry", "registry", "DEFAULT_BUCKETS"]
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from .budget import WorkPlan, plan_work, section_cost_seconds, word_count
+from .config import Settings
+from .jobs import Job, JobQueue, JobStatus, worker_identity
+from .metrics import registry
+from .models import DocumentArtifacts, DocumentStatus
+from .profiling import ProfileCapture, profile_if_slow
+from .similarity import VectorIndex
+from .storage import StorageManager
+from .textstore import TextStore
+from .utils import ParsedDocument, load_document, pool_embeddings
+
+if TYPE_CHECKING:
+    from .workflow.nodes import PaperAnalysisWorkflow
+
+logger = logging.getLogger(__name__)
+
+
+class ApplicationContext:
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.storage = StorageManager(settings.storage_path / "paperhelper.json")
+        self.jobs = JobQueue(
+            settings.storage_path / "jobs.json",
+            lease_seconds=settings.job_lease_seconds,
+            max_attempts=settings.job_max_attempts,
+            backoff_seconds=settings.job_retry_backoff_seconds,
+        )
+        self.vectors = VectorIndex(settings.storage_path / "vectors")
+        self.texts = TextStore(settings.storage_path)
+        self._workflow: Optional[PaperAnalysisWorkflow] = None
+
+    @property
+    def workflow(self) -> PaperAnalysisWorkflow:
+        # Built on first use so API processes that only enqueue never import the analysis stack.
+        if self._workflow is None:
+            from .llm import ResponseCache, get_llm_client
+            from .workflow.nodes import PaperAnalysisWorkflow
+
+            self._workflow = PaperAnalysisWorkflow(
+                llm=get_llm_client(self.settings),
+                summary_mode=self.settings.summary_mode,
+                summary_fan_in=self.settings.summary_fan_in,
+                summary_cache=ResponseCache(self.settings.storage_path / "summary-cache"),
+            )
+        return self._workflow
+
+
+def plan_document(
+    doc_id: str, parsed: ParsedDocument, context: ApplicationContext
+) -> Tuple[ParsedDocument, WorkPlan]:
+    """Choose the work plan for ``parsed``, re-chunk it to match and keep the text store in sync."""
+
+    settings = context.settings
+    plan = plan_work(
+        word_count(parsed.text),
+        settings.job_time_budget_seconds,
+        section_cost_seconds(settings),
+        fan_in=settings.summary_fan_in,
+    )
+    chunked = parsed.rechunked(plan.chunk_size, plan.overlap)
+    if chunked is not parsed or not context.texts.has(doc_id):
+        context.texts.save(doc_id, chunked)
+    return chunked, plan
+
+
+def _process_document(
+    doc_id: str,
+    parsed: ParsedDocument,
+    context: ApplicationContext,
+    timings: Dict[str, float] | None = None,
+    plan: WorkPlan | None = None,
+    deadline: float | None = None,
+) -> Tuple[DocumentArtifacts, List[List[float]], List[str]]:
+    from .workflow.nodes import WorkflowState
+
+    state = WorkflowState(
+        document_id=doc_id, filename=doc_id, sections=parsed.sections, plan=plan or WorkPlan(), deadline=deadline
+    )
+    artifacts = context.workflow.run(state)
+    if timings is not None:
+        timings.update(state.timings)
+    return artifacts, state.embeddings or [], state.degraded
+
+
+def _timing_metadata(timings: Dict[str, float], file_path: Path) -> Dict[str, str]:
+    metadata = {f"timing.{stage}_seconds": f"{seconds:.6f}" for stage, seconds in timings.items()}
+    metadata["bytes_processed"] = str(file_path.stat().st_size)
+    return metadata
+
+
+def _store_artifacts(
+    doc_id: str, artifacts: DocumentArtifacts, context: ApplicationContext, metadata: Dict[str, str] | None = None
+) -> None:
+    record = context.storage.get_record(doc_id)
+    if not record:
+        raise RuntimeError(f"Document {doc_id} not found for storage update")
+    record.status = DocumentStatus.COMPLETED
+    record.artifacts = artifacts
+    record.metadata.update(metadata or {})
+    context.storage.save_record(record)
+
+
+def _update_record_status(doc_id: str, status: DocumentStatus, context: ApplicationContext, error: str | None = None) -> None:
+    record = context.storage.get_record(doc_id)
+    if not record:
+        return
+    record.status = status
+    record.error = error
+    context.storage.save_record(record)
+
+
+def _record_profile(doc_id: str, capture: ProfileCapture, context: ApplicationContext) -> None:
+    record = context.storage.get_record(doc_id)
+    if not record or not capture.path:
+        return
+    record.metadata["profile_path"] = str(capture.path)
+    record.metadata["profile_seconds"] = f"{capture.elapsed:.6f}"
+    context.storage.save_record(record)
+
+
+def analyze_document(doc_id: str, file_path: Path, context: ApplicationContext, profile: bool = False) -> None:
+    settings = context.settings
+    threshold = 0.0 if profile else settings.profile_threshold_seconds
+    capture: ProfileCapture | None = None
+    try:
+        with profile_if_slow(file_path.parent, profile or settings.profile_enabled, threshold) as capture:
+            _run_analysis(doc_id, file_path, context)
+    finally:
+        if capture and capture.path:
+            _record_profile(doc_id, capture, context)
+
+
+def _run_analysis(doc_id: str, file_path: Path, context: ApplicationContext) -> None:
+    registry.add_gauge("paperhelper_jobs_in_flight", 1)
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        parsed = context.texts.load_parsed(doc_id)
+        if parsed is None:
+            parsed = load_document(file_path)
+        parsed, plan = plan_document(doc_id, parsed, context)
+        timings["parse"] = time.perf_counter() - start
+        deadline = start + plan.time_budget_seconds if plan.time_budget_seconds else None
+        artifacts, embeddings, degraded = _process_document(doc_id, parsed, context, timings, plan, deadline)
+        timings["total"] = time.perf_counter() - start
+        metadata = _timing_metadata(timings, file_path)
+        metadata["content_length"] = str(len(parsed.text))
+        metadata.update(plan.to_metadata())
+        metadata["plan.degraded"] = ",".join(degraded)
+        _store_artifacts(doc_id, artifacts, context, metadata)
+        context.vectors.upsert(doc_id, pool_embeddings(embeddings))
+    except Exception:  # noqa: BLE001
+        registry.inc("paperhelper_documents_total", status=DocumentStatus.FAILED.value)
+        raise
+    else:
+        registry.inc("paperhelper_documents_total", status=DocumentStatus.COMPLETED.value)
+    finally:
+        registry.observe("paperhelper_document_seconds", time.perf_counter() - start)
+        registry.add_gauge("paperhelper_jobs_in_flight", -1)
+
+
+_worker_slots: Dict[int, threading.BoundedSemaphore] = {}
+_worker_slots_guard = threading.Lock()
+
+
+def _slots_for(max_workers: int) -> threading.BoundedSemaphore:
+    with _worker_slots_guard:
+        return _worker_slots.setdefault(max_workers, threading.BoundedSemaphore(max(1, max_workers)))
+
+
+@contextmanager
+def _lease_heartbeat(job: Job, context: ApplicationContext) -> Iterator[None]:
+    """Renew ``job``'s lease every third of the lease period while the block runs."""
+
+    stop = threading.Event()
+    interval = max(0.1, context.jobs.lease_seconds / 3)
+
+    def _beat() -> None:
+        while not stop.wait(interval):
+            if not context.jobs.renew(job.id, job.lease_id):
+                logger.warning("Lost the lease on %s; another worker may pick it up", job.id)
+                return
+
+    heartbeat = threading.Thread(target=_beat, name=f"lease-{job.id}", daemon=True)
+    heartbeat.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        heartbeat.join()
+
+
+def execute_job(job: Job, context: ApplicationContext, schedule_retries: bool = True) -> None:
+    try:
+        with _lease_heartbeat(job, context):
+            analyze_document(job.id, job.file_path, context, job.profile)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Analysis of %s failed on attempt %d", job.id, job.attempts)
+        failed = context.jobs.fail(job.id, str(exc), lease_id=job.lease_id)
+        if failed is None:
+            # Either the job was removed or its lease went to another worker, which now owns the record.
+            if context.jobs.get(job.id) is None:
+                _update_record_status(job.id, DocumentStatus.FAILED, context, error=str(exc))
+            return
+        if failed.status == JobStatus.FAILED:
+            _update_record_status(job.id, DocumentStatus.FAILED, context, error=str(exc))
+            return
+        _update_record_status(job.id, DocumentStatus.PROCESSING, context, error=str(exc))
+        if not schedule_retries:
+            return
+        delay = max(0.0, (failed.available_at - datetime.utcnow()).total_seconds())
+        retry = threading.Timer(delay, drain_jobs, args=(context,))
+        retry.daemon = True
+        retry.start()
+    else:
+        context.jobs.complete(job.id, lease_id=job.lease_id)
+
+
+def _recover_leases(context: ApplicationContext) -> None:
+    """Release expired or abandoned leases and fail the records of jobs that ran out of attempts."""
+
+    for job in context.jobs.recover():
+        if job.status == JobStatus.FAILED:
+            logger.error("Giving up on %s after %d attempts: %s", job.id, job.attempts, job.last_error)
+            _update_record_status(job.id, DocumentStatus.FAILED, context, error=job.last_error)
+
+
+def drain_jobs(
+    context: ApplicationContext, schedule_retries: bool = True, stop: Optional[threading.Event] = None
+) -> int:
+    """Run ready jobs until none are left; at most ``max_workers`` drains run at once per process.
+
+    ``schedule_retries`` arms a timer for jobs put into backoff, which polling workers do not need.
+    ``stop`` ends the drain once the job in progress has finished.
+    """
+
+    slots = _slots_for(context.settings.max_workers)
+    worker_id = worker_identity()
+    processed = 0
+    _recover_leases(context)
+    while slots.acquire(blocking=False):
+        try:
+            while not (stop and stop.is_set()) and (job := context.jobs.lease(worker_id)) is not None:
+                registry.set_gauge("paperhelper_jobs_queued", context.jobs.depth())
+                execute_job(job, context, schedule_retries)
+                processed += 1
+        finally:
+            slots.release()
+        # A job enqueued while every slot was busy may have been missed by the other drains.
+        if (stop and stop.is_set()) or not context.jobs.has_ready():
+            break
+    return processed
+
+
+def recover_jobs(context: ApplicationContext) -> bool:
+    """Requeue abandoned leases and records left ``PROCESSING`` without a job; return whether work is ready."""
+
+    _recover_leases(context)
+    for doc_id, record in context.storage.list_records().items():
+        if record.status != DocumentStatus.PROCESSING:
+            continue
+        job = context.jobs.get(doc_id)
+        if job and job.status in {JobStatus.QUEUED, JobStatus.LEASED}:
+            continue
+        if job and job.status == JobStatus.FAILED:
+            _update_record_status(doc_id, DocumentStatus.FAILED, context, error=job.last_error)
+            continue
+        if not record.storage_path.exists():
+            _update_record_status(doc_id, DocumentStatus.FAILED, context, error="Uploaded file is missing")
+            continue
+        context.jobs.enqueue(doc_id, record.storage_path, priority=record.storage_path.stat().st_size)
+    registry.set_gauge("paperhelper_jobs_queued", context.jobs.depth())
+    return context.jobs.has_ready()
+
+
+__all__ = ["ApplicationContext", "analyze_document", "drain_jobs", "execute_job", "plan_document", "recover_jobs"]
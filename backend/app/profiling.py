@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import io
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    import cProfile
+
+PROFILE_FILENAME = "profile.pstats"
+PROFILE_REPORT_FILENAME = "profile.txt"
+
+# On Python 3.12+ a profiler is process-wide and a second ``enable()`` raises, so analyses take turns.
+_profiler_lock = threading.Lock()
+
+
+@dataclass
+class ProfileCapture:
+    elapsed: float = 0.0
+    path: Optional[Path] = None
+
+
+@contextmanager
+def profile_if_slow(output_dir: Path, enabled: bool, threshold_seconds: float) -> Iterator[ProfileCapture]:
+    """Profile the block and keep the result only when it ran for at least ``threshold_seconds``.
+
+    When ``enabled`` is false the block runs untouched and no profiler module is imported. While
+    another block in the process is being profiled, or another profiling tool is active, the block
+    runs unprofiled rather than failing.
+    """
+
+    capture = ProfileCapture()
+    if not enabled or not _profiler_lock.acquire(blocking=False):
+        yield capture
+        return
+
+    try:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            yield capture
+            return
+        start = time.perf_counter()
+        try:
+            yield capture
+        finally:
+            profiler.disable()
+            capture.elapsed = time.perf_counter() - start
+            if capture.elapsed >= threshold_seconds:
+                capture.path = _dump_profile(profiler, output_dir)
+    finally:
+        _profiler_lock.release()
+
+
+def _dump_profile(profiler: cProfile.Profile, output_dir: Path) -> Path:
+    import pstats
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / PROFILE_FILENAME
+    profiler.dump_stats(str(path))
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(50)
+    (output_dir / PROFILE_REPORT_FILENAME).write_text(report.getvalue(), encoding="utf-8")
+    return path
+
+
+__all__ = ["PROFILE_FILENAME", "PROFILE_REPORT_FILENAME", "ProfileCapture", "profile_if_slow"]
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import os
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .locking import atomic_write_text, file_lock
+from .storage import StorageManager
+from .utils import EMBEDDING_DIM, keyword_counts
+
+BLOCK_ROWS = 4096
+
+
+@lru_cache(maxsize=1)
+def _numpy() -> Optional[Any]:
+    try:
+        import numpy  # type: ignore
+    except ModuleNotFoundError:
+        return None
+    return numpy
+
+
+def _decode_rows(chunk: bytes, dim: int) -> List[List[float]]:
+    values = array("f")
+    values.frombytes(chunk)
+    return [list(values[base : base + dim]) for base in range(0, len(values), dim)]
+
+
+def _score_block(chunk: bytes, dim: int, queries: Sequence[Sequence[float]]) -> List[List[float]]:
+    """Dot product of every row in ``chunk`` with each query; vectorized when NumPy is installed."""
+
+    np = _numpy()
+    if np is not None:
+        rows = np.frombuffer(chunk, dtype=np.float32).reshape(-1, dim)
+        return (rows @ np.asarray(queries, dtype=np.float32).T).tolist()
+    return [[sum(a * b for a, b in zip(row, query)) for query in queries] for row in _decode_rows(chunk, dim)]
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else list(vector)
+
+
+class VectorIndex:
+    """Document vectors stored as fixed-width float32 rows, scanned in blocks.
+
+    ``vectors.f32`` holds one row per line of ``vectors.ids``; an id is appended on first
+    upsert and its row is overwritten in place afterwards. Queries and clustering read
+    ``block_rows`` rows at a time, so memory stays bounded regardless of corpus size.
+    """
+
+    def __init__(self, directory: Path, dim: int = EMBEDDING_DIM, block_rows: int = BLOCK_ROWS) -> None:
+        self.directory = directory
+        self.dim = dim
+        self.block_rows = block_rows
+        self.vectors_path = directory / "vectors.f32"
+        self.ids_path = directory / "vectors.ids"
+        directory.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.ids_path):
+            self.vectors_path.touch()
+            self.ids_path.touch()
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dim * array("f").itemsize
+
+    def ids(self) -> List[str]:
+        ids = self.ids_path.read_text(encoding="utf-8").splitlines()
+        rows = self.vectors_path.stat().st_size // self.row_bytes
+        return ids[:rows]
+
+    def upsert(self, doc_id: str, vector: Sequence[float]) -> None:
+        if len(vector) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dimensional vector, got {len(vector)}")
+        row = array("f", _normalize(vector)).tobytes()
+        with file_lock(self.ids_path):
+            ids = self.ids_path.read_text(encoding="utf-8").splitlines()
+            if doc_id in ids:
+                with self.vectors_path.open("r+b") as handle:
+                    handle.seek(ids.index(doc_id) * self.row_bytes)
+                    handle.write(row)
+                return
+            with self.vectors_path.open("ab") as handle:
+                handle.write(row)
+            with self.ids_path.open("a", encoding="utf-8") as handle:
+                handle.write(f"{doc_id}\n")
+
+    def remove(self, doc_ids: Iterable[str]) -> int:
+        """Drop rows for ``doc_ids`` by rewriting both files; return the number removed."""
+
+        doc_ids = set(doc_ids)
+        with file_lock(self.ids_path):
+            ids = self.ids()
+            keep = [row for row, doc_id in enumerate(ids) if doc_id not in doc_ids]
+            if len(keep) == len(ids):
+                return 0
+            tmp_path = self.vectors_path.with_name(f"{self.vectors_path.name}.{os.getpid()}.tmp")
+            with self.vectors_path.open("rb") as source, tmp_path.open("wb") as target:
+                for row in keep:
+                    source.seek(row * self.row_bytes)
+                    target.write(source.read(self.row_bytes))
+            os.replace(tmp_path, self.vectors_path)
+            atomic_write_text(self.ids_path, "".join(f"{ids[row]}\n" for row in keep))
+        return len(ids) - len(keep)
+
+    def get(self, doc_id: str) -> Optional[List[float]]:
+        ids = self.ids()
+        if doc_id not in ids:
+            return None
+        with self.vectors_path.open("rb") as handle:
+            handle.seek(ids.index(doc_id) * self.row_bytes)
+            return _decode_rows(handle.read(self.row_bytes), self.dim)[0]
+
+    @contextmanager
+    def snapshot(self) -> Iterator[Tuple[List[str], BinaryIO]]:
+        """Yield ``(ids, handle)`` taken together under the index lock.
+
+        Rows appended afterwards lie past ``len(ids)``, and a concurrent ``remove`` replaces the
+        file rather than truncating it, so the open handle keeps describing exactly ``ids``.
+        """
+
+        with file_lock(self.ids_path):
+            ids = self.ids()
+            handle = self.vectors_path.open("rb")
+        with handle:
+            yield ids, handle
+
+    def iter_blocks(self, handle: BinaryIO, rows: int) -> Iterator[Tuple[int, bytes]]:
+        """Yield ``(first_row, raw_bytes)`` for consecutive blocks of the first ``rows`` rows."""
+
+        block_bytes = self.block_rows * self.row_bytes
+        handle.seek(0)
+        start = 0
+        while start < rows:
+            chunk = handle.read(min(block_bytes, (rows - start) * self.row_bytes))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk) // self.row_bytes
+
+    def _read_row(self, handle: BinaryIO, row: int) -> List[float]:
+        handle.seek(row * self.row_bytes)
+        return _decode_rows(handle.read(self.row_bytes), self.dim)[0]
+
+    def most_similar(self, doc_id: str, limit: int = 10) -> List[Tuple[str, float]]:
+        with self.snapshot() as (ids, handle):
+            if doc_id not in ids:
+                return []
+            query = self._read_row(handle, ids.index(doc_id))
+            heap: List[Tuple[float, str]] = []
+            for start, chunk in self.iter_blocks(handle, len(ids)):
+                for offset, (score,) in enumerate(_score_block(chunk, self.dim, [query])):
+                    candidate = ids[start + offset]
+                    if candidate == doc_id:
+                        continue
+                    if len(heap) < limit:
+                        heapq.heappush(heap, (score, candidate))
+                    elif score > heap[0][0]:
+                        heapq.heapreplace(heap, (score, candidate))
+        return [(candidate, score) for score, candidate in sorted(heap, reverse=True)]
+
+    def kmeans(self, k: int, iterations: int = 20) -> Tuple[List[str], array, List[List[float]]]:
+        """Spherical k-means over one snapshot of the rows; returns ``(ids, assignments, centroids)``."""
+
+        with self.snapshot() as (ids, handle):
+            if not ids:
+                return ids, array("i"), []
+            k = max(1, min(k, len(ids)))
+            seeds = [round(idx * (len(ids) - 1) / max(1, k - 1)) for idx in range(k)] if k > 1 else [0]
+            centroids = [self._read_row(handle, idx) for idx in seeds]
+            np = _numpy()
+            if np is not None:
+                return ids, *self._kmeans_numpy(np, handle, len(ids), centroids, iterations)
+            assignments = array("i", [-1]) * len(ids)
+            for _ in range(iterations):
+                sums = [[0.0] * self.dim for _ in range(k)]
+                changed = 0
+                for start, chunk in self.iter_blocks(handle, len(ids)):
+                    scores = _score_block(chunk, self.dim, centroids)
+                    for offset, (row, row_scores) in enumerate(zip(_decode_rows(chunk, self.dim), scores)):
+                        best = max(range(k), key=row_scores.__getitem__)
+                        if assignments[start + offset] != best:
+                            assignments[start + offset] = best
+                            changed += 1
+                        target = sums[best]
+                        for idx, value in enumerate(row):
+                            target[idx] += value
+                centroids = [_normalize(total) if any(total) else centroid for total, centroid in zip(sums, centroids)]
+                if not changed:
+                    break
+        return ids, assignments, centroids
+
+    def _kmeans_numpy(
+        self, np: Any, handle: BinaryIO, rows: int, centroids: List[List[float]], iterations: int
+    ) -> Tuple[array, List[List[float]]]:
+        """The k-means loop with per-block ``argmax`` and ``add.at`` instead of per-row Python."""
+
+        centers = np.asarray(centroids, dtype=np.float32)
+        assignments = np.full(rows, -1, dtype=np.int32)
+        for _ in range(iterations):
+            sums = np.zeros_like(centers, dtype=np.float64)
+            changed = 0
+            for start, chunk in self.iter_blocks(handle, rows):
+                block = np.frombuffer(chunk, dtype=np.float32).reshape(-1, self.dim)
+                best = (block @ centers.T).argmax(axis=1).astype(np.int32)
+                current = assignments[start : start + len(block)]
+                changed += int(np.count_nonzero(current != best))
+                current[:] = best
+                np.add.at(sums, best, block)
+            norms = np.linalg.norm(sums, axis=1)
+            filled = norms > 0
+            centers[filled] = (sums[filled] / norms[filled, None]).astype(np.float32)
+            if not changed:
+                break
+        return array("i", assignments.tolist()), centers.tolist()
+
+
+def cluster_corpus(
+    storage: StorageManager, index: VectorIndex, output_path: Path, k: int = 20, iterations: int = 20
+) -> Dict[str, Any]:
+    """Cluster every indexed document and write the result to ``output_path``.
+
+    Each cluster is labelled with the most frequent keywords of its members' glossary terms and
+    mind-map labels, taken from the raw record store without building ``DocumentRecord`` models.
+    """
+
+    ids, assignments, _ = index.kmeans(k, iterations=iterations)
+    cluster_count = max(assignments) + 1 if ids else 0
+    membership = dict(zip(ids, assignments))
+    counts: List[Counter] = [Counter() for _ in range(cluster_count)]
+    sizes = [0] * cluster_count
+    for cluster_id in assignments:
+        sizes[cluster_id] += 1
+    for doc_id, labels in storage.iter_artifact_labels():
+        cluster_id = membership.get(doc_id)
+        if cluster_id is not None:
+            counts[cluster_id].update(keyword_counts(" ".join(labels)))
+    clusters = []
+    for cluster_id in range(cluster_count):
+        if not sizes[cluster_id]:
+            continue
+        keywords = [token for token, _ in counts[cluster_id].most_common(3)]
+        clusters.append(
+            {
+                "id": cluster_id,
+                "label": " / ".join(keywords) or f"Cluster {cluster_id}",
+                "keywords": keywords,
+                "size": sizes[cluster_id],
+            }
+        )
+    result = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "k": k,
+        "clusters": clusters,
+        "assignments": membership,
+    }
+    atomic_write_text(output_path, json.dumps(result))
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .config import get_settings
+
+    parser = argparse.ArgumentParser(prog="python -m app.similarity", description="Cluster the document corpus.")
+    parser.add_argument("--k", type=int, default=20, help="Number of clusters.")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    storage = StorageManager(settings.storage_path / "paperhelper.json")
+    index = VectorIndex(settings.storage_path / "vectors")
+    result = cluster_corpus(storage, index, settings.storage_path / "clusters.json", k=args.k, iterations=args.iterations)
+    for cluster in result["clusters"]:
+        print(f"{cluster['id']:>4} {cluster['size']:>7}  {cluster['label']}")
+    return 0
+
+
+__all__ = ["VectorIndex", "cluster_corpus"]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
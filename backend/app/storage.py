@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .locking import atomic_write_text, file_lock
+from .metrics import registry
 from .models import DocumentArtifacts, DocumentRecord
 
 
@@ -11,19 +13,28 @@ class StorageManager:
     def __init__(self, db_path: Path) -> None:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.db_path.exists():
-            self.db_path.write_text("{}", encoding="utf-8")
+        with file_lock(self.db_path):
+            if not self.db_path.exists():
+                atomic_write_text(self.db_path, "{}")
 
     def _read(self) -> Dict[str, dict]:
-        return json.loads(self.db_path.read_text(encoding="utf-8"))
+        with registry.timer("paperhelper_storage_seconds", op="read"):
+            raw = self.db_path.read_text(encoding="utf-8")
+            data = json.loads(raw)
+        registry.inc("paperhelper_storage_bytes_total", len(raw), op="read")
+        return data
 
     def _write(self, data: Dict[str, dict]) -> None:
-        self.db_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        with registry.timer("paperhelper_storage_seconds", op="write"):
+            raw = json.dumps(data, separators=(",", ":"))
+            atomic_write_text(self.db_path, raw)
+        registry.inc("paperhelper_storage_bytes_total", len(raw), op="write")
 
     def save_record(self, record: DocumentRecord) -> None:
-        data = self._read()
-        data[record.id] = record.to_dict()
-        self._write(data)
+        with file_lock(self.db_path):
+            data = self._read()
+            data[record.id] = record.to_dict()
+            self._write(data)
 
     def get_record(self, doc_id: str) -> Optional[DocumentRecord]:
         data = self._read()
@@ -32,6 +43,45 @@ class StorageManager:
             return None
         return DocumentRecord.from_dict(record_data)
 
+    def filenames(self, doc_ids: Iterable[str]) -> Dict[str, str]:
+        """Filenames of the given documents that exist, read from the raw store without building records."""
+
+        data = self._read()
+        return {doc_id: data[doc_id]["filename"] for doc_id in doc_ids if doc_id in data}
+
+    def iter_artifact_labels(self) -> Iterator[Tuple[str, List[str]]]:
+        """Yield ``(doc_id, glossary terms + mind-map labels)`` without building full records.
+
+        The store is a single JSON file, so it is still parsed into memory in one piece; only the
+        ``DocumentRecord`` and artifact models are skipped, and each raw payload is dropped once read.
+        """
+
+        data = self._read()
+        for doc_id in list(data):
+            artifacts = data.pop(doc_id).get("artifacts") or {}
+            labels = [entry["term"] for entry in artifacts.get("glossary", [])]
+            labels.extend(node["label"] for node in artifacts.get("mind_map", {}).get("nodes", []))
+            yield doc_id, labels
+
     def list_records(self) -> Dict[str, DocumentRecord]:
         data = self._read()
         return {doc_id: DocumentRecord.from_dict(payload) for doc_id, payload in data.items()}
+
+    def delete_records(self, doc_ids: Iterable[str]) -> int:
+        doc_ids = set(doc_ids)
+        with file_lock(self.db_path):
+            data = self._read()
+            removed = [doc_id for doc_id in data if doc_id in doc_ids]
+            for doc_id in removed:
+                del data[doc_id]
+            if removed:
+                self._write(data)
+        return len(removed)
+
+    def compact(self) -> int:
+        """Rewrite the store in compact form; return the bytes saved."""
+
+        with file_lock(self.db_path):
+            before = self.db_path.stat().st_size
+            self._write(self._read())
+            return max(0, before - self.db_path.stat().st_size)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .locking import atomic_write_text
+from .utils import CHUNK_OVERLAP, CHUNK_SIZE, ParsedDocument, section_spans, sentence_starts
+
+TEXT_FILENAME = "text.txt"
+INDEX_FILENAME = "text.idx.json"
+INDEX_VERSION = 1
+
+
+def _byte_offsets(text: str, offsets: Iterable[int]) -> Dict[int, int]:
+    """Map character offsets in ``text`` to UTF-8 byte offsets, encoding each gap once."""
+
+    mapping: Dict[int, int] = {}
+    position = 0
+    consumed = 0
+    for offset in sorted(set(offsets)):
+        consumed += len(text[position:offset].encode("utf-8"))
+        mapping[offset] = consumed
+        position = offset
+    return mapping
+
+
+def _char_offsets(data: bytes, offsets: Iterable[int]) -> Dict[int, int]:
+    mapping: Dict[int, int] = {}
+    position = 0
+    consumed = 0
+    for offset in sorted(set(offsets)):
+        consumed += len(data[position:offset].decode("utf-8", errors="replace"))
+        mapping[offset] = consumed
+        position = offset
+    return mapping
+
+
+def _is_continuation(view: Any, offset: int) -> bool:
+    return offset < len(view) and view[offset] & 0xC0 == 0x80
+
+
+class TextStore:
+    """Extracted document text, persisted once per document next to the upload.
+
+    ``text.txt`` is the UTF-8 text exactly as parsed; ``text.idx.json`` records byte offsets
+    of sections (with their titles), sentence starts and page starts. Slices are read through
+    ``mmap`` so serving a snippet never loads the whole document.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def text_path(self, doc_id: str) -> Path:
+        return self.root / doc_id / TEXT_FILENAME
+
+    def index_path(self, doc_id: str) -> Path:
+        return self.root / doc_id / INDEX_FILENAME
+
+    def has(self, doc_id: str) -> bool:
+        return self.text_path(doc_id).exists() and self.index_path(doc_id).exists()
+
+    def save(self, doc_id: str, parsed: ParsedDocument) -> Dict[str, Any]:
+        text = parsed.text
+        spans = section_spans(text, parsed.chunk_size, parsed.overlap)
+        sentences = sentence_starts(text)
+        pages = parsed.page_offsets or [0]
+        to_bytes = _byte_offsets(text, [len(text), *sentences, *pages, *(o for span in spans for o in span)])
+        index = {
+            "version": INDEX_VERSION,
+            "bytes": to_bytes[len(text)],
+            "chars": len(text),
+            "chunk_size": parsed.chunk_size,
+            "overlap": parsed.overlap,
+            "sections": [
+                [title, to_bytes[start], to_bytes[end]] for (title, _), (start, end) in zip(parsed.sections, spans)
+            ],
+            "sentences": [to_bytes[offset] for offset in sentences],
+            "pages": [to_bytes[offset] for offset in pages],
+        }
+        path = self.text_path(doc_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The index is written last, so an index on disk always describes a complete text file.
+        atomic_write_text(path, text)
+        atomic_write_text(self.index_path(doc_id), json.dumps(index, separators=(",", ":")))
+        return index
+
+    def index(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        path = self.index_path(doc_id)
+        if not path.exists():
+            return None
+        index = json.loads(path.read_text(encoding="utf-8"))
+        return index if index.get("version") == INDEX_VERSION else None
+
+    def size(self, doc_id: str) -> int:
+        return self.text_path(doc_id).stat().st_size
+
+    def read(self, doc_id: str, start: int = 0, end: Optional[int] = None) -> Tuple[int, int, str]:
+        """Return ``(start, end, text)`` for the byte range, widened to whole UTF-8 characters."""
+
+        with self.text_path(doc_id).open("rb") as handle:
+            total = handle.seek(0, 2)
+            start = max(0, min(start, total))
+            end = total if end is None else max(start, min(end, total))
+            if total == 0:
+                return 0, 0, ""
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                while start > 0 and _is_continuation(view, start):
+                    start -= 1
+                while _is_continuation(view, end):
+                    end += 1
+                return start, end, view[start:end].decode("utf-8", errors="replace")
+
+    def load_parsed(self, doc_id: str) -> Optional[ParsedDocument]:
+        """Rebuild the ``ParsedDocument`` produced at upload, or None when nothing was stored."""
+
+        index = self.index(doc_id)
+        if index is None or not self.text_path(doc_id).exists():
+            return None
+        data = self.text_path(doc_id).read_bytes()
+        if len(data) != index["bytes"]:
+            return None
+        section_offsets = [offset for _, start, end in index["sections"] for offset in (start, end)]
+        to_chars = _char_offsets(data, [*index["pages"], *section_offsets])
+        text = data.decode("utf-8")
+        sections: List[Tuple[str, str]] = [
+            (title, " ".join(text[to_chars[start] : to_chars[end]].split())) for title, start, end in index["sections"]
+        ]
+        page_offsets = [to_chars[offset] for offset in index["pages"]]
+        return ParsedDocument(
+            text=text,
+            sections=sections,
+            page_offsets=page_offsets,
+            chunk_size=index.get("chunk_size", CHUNK_SIZE),
+            overlap=index.get("overlap", CHUNK_OVERLAP),
+        )
+
+
+__all__ = ["INDEX_FILENAME", "TEXT_FILENAME", "TextStore"]
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
 
+import math
 import re
 import uuid
-from dataclasses import dataclass
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Iterable, Iterator, List, Tuple
+
+from .metrics import registry
+
+
+CHUNK_SIZE = 1200
+CHUNK_OVERLAP = 150
 
 
 @dataclass
 class ParsedDocument:
     text: str
     sections: List[Tuple[str, str]]
+    page_offsets: List[int] = field(default_factory=lambda: [0])
+    chunk_size: int = CHUNK_SIZE
+    overlap: int = CHUNK_OVERLAP
+
+    def rechunked(self, chunk_size: int, overlap: int) -> ParsedDocument:
+        if (chunk_size, overlap) == (self.chunk_size, self.overlap):
+            return self
+        sections = _split_into_sections(self.text, chunk_size, overlap)
+        return replace(self, sections=sections, chunk_size=chunk_size, overlap=overlap)
 
 
 SUPPORTED_EXTENSIONS = {".pdf", ".md", ".markdown", ".txt"}
@@ -29,53 +47,87 @@ def generate_document_id() -> str:
     return uuid.uuid4().hex
 
 
-def load_document(path: Path, max_size_mb: int = 25) -> ParsedDocument:
+def validate_document(path: Path, max_size_mb: int = 25) -> None:
+    """Check type and size without parsing, so request handlers can reject uploads cheaply."""
+
     if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
         raise UnsupportedDocumentError(f"Unsupported file type: {path.suffix}")
     if path.stat().st_size > max_size_mb * 1024 * 1024:
         raise DocumentTooLargeError(f"File size exceeds {max_size_mb} MB limit")
 
-    if path.suffix.lower() == ".pdf":
-        text = _extract_pdf_text(path)
-    else:
-        text = path.read_text(encoding="utf-8", errors="ignore")
-
-    sections = _split_into_sections(text)
-    return ParsedDocument(text=text, sections=sections)
-
 
-def _extract_pdf_text(path: Path) -> str:
+def load_document(path: Path, max_size_mb: int = 25) -> ParsedDocument:
+    validate_document(path, max_size_mb)
+    size = path.stat().st_size
+    source_format = "pdf" if path.suffix.lower() == ".pdf" else "text"
+    with registry.timer("paperhelper_parse_seconds", format=source_format):
+        if source_format == "pdf":
+            pages = _extract_pdf_pages(path)
+        else:
+            pages = [path.read_text(encoding="utf-8", errors="ignore")]
+        text = "\n".join(pages)
+        sections = _split_into_sections(text)
+    registry.inc("paperhelper_parsed_bytes_total", size, format=source_format)
+    return ParsedDocument(text=text, sections=sections, page_offsets=_page_offsets(pages))
+
+
+def _page_offsets(pages: List[str]) -> List[int]:
+    offsets: List[int] = []
+    position = 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page) + 1
+    return offsets
+
+
+def _extract_pdf_pages(path: Path) -> List[str]:
     try:
         import PyPDF2  # type: ignore
     except ModuleNotFoundError:
         data = path.read_bytes()
-        return data.decode("latin-1", errors="ignore")
+        return [data.decode("latin-1", errors="ignore")]
 
-    text_fragments: List[str] = []
     reader = PyPDF2.PdfReader(str(path))
-    for page in reader.pages:
-        text_fragments.append(page.extract_text() or "")
-    return "\n".join(text_fragments)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _chunk_ranges(word_count: int, chunk_size: int, overlap: int) -> Iterator[Tuple[int, int]]:
+    start = 0
+    while start < word_count:
+        end = min(word_count, start + chunk_size)
+        yield start, end
+        if end == word_count:
+            break
+        start = max(end - overlap, start + 1)
 
 
-def _split_into_sections(text: str, chunk_size: int = 1200, overlap: int = 150) -> List[Tuple[str, str]]:
+def _split_into_sections(
+    text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP
+) -> List[Tuple[str, str]]:
     words = text.split()
     if not words:
         return [("Empty", "")] 
     sections: List[Tuple[str, str]] = []
-    start = 0
-    while start < len(words):
-        end = min(len(words), start + chunk_size)
-        chunk_words = words[start:end]
-        chunk_text = " ".join(chunk_words)
+    for start, end in _chunk_ranges(len(words), chunk_size, overlap):
+        chunk_text = " ".join(words[start:end])
         heading = _infer_heading(chunk_text, len(sections) + 1)
         sections.append((heading, chunk_text))
-        if end == len(words):
-            break
-        start = max(end - overlap, start + 1)
     return sections
 
 
+def section_spans(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[Tuple[int, int]]:
+    """Character spans in ``text`` of the chunks produced by ``_split_into_sections``."""
+
+    words = [match.span() for match in re.finditer(r"\S+", text)]
+    if not words:
+        return [(0, 0)]
+    return [(words[start][0], words[end - 1][1]) for start, end in _chunk_ranges(len(words), chunk_size, overlap)]
+
+
+def sentence_starts(text: str) -> List[int]:
+    return [0] + [match.end() for match in re.finditer(r"(?<=[.!?])\s+", text)]
+
+
 def _infer_heading(chunk: str, idx: int) -> str:
     heading_match = re.search(r"^#+\s*(.+)$", chunk, re.MULTILINE)
     if heading_match:
@@ -86,28 +138,48 @@ def _infer_heading(chunk: str, idx: int) -> str:
     return first_sentence or f"Section {idx}"
 
 
+EMBEDDING_DIM = 10
+
+
 def build_embedding(section_text: str) -> List[float]:
     tokens = re.findall(r"[a-zA-Z]+", section_text.lower())
-    vector = [0.0] * 10
+    vector = [0.0] * EMBEDDING_DIM
     for token in tokens:
-        bucket = hash(token) % len(vector)
+        # crc32 rather than hash(): str hashes are salted per process, and vectors are persisted.
+        bucket = zlib.crc32(token.encode("utf-8")) % len(vector)
         vector[bucket] += 1.0
     length = sum(vector) or 1.0
     return [value / length for value in vector]
 
 
+def pool_embeddings(embeddings: Iterable[List[float]]) -> List[float]:
+    """Mean-pool section embeddings into one L2-normalized document vector."""
+
+    pooled = [0.0] * EMBEDDING_DIM
+    count = 0
+    for embedding in embeddings:
+        count += 1
+        for idx, value in enumerate(embedding):
+            pooled[idx] += value
+    norm = math.sqrt(sum(value * value for value in pooled))
+    if not count or not norm:
+        return pooled
+    return [value / norm for value in pooled]
+
+
+def keyword_counts(text: str) -> Counter:
+    return Counter(re.findall(r"[a-zA-Z]{5,}", text.lower()))
+
+
 def extract_keywords(text: str, top_k: int = 10) -> List[str]:
-    tokens = re.findall(r"[a-zA-Z]{5,}", text.lower())
-    frequency = {}
-    for token in tokens:
-        frequency[token] = frequency.get(token, 0) + 1
-    sorted_tokens = sorted(frequency.items(), key=lambda item: item[1], reverse=True)
-    return [token for token, _ in sorted_tokens[:top_k]]
+    return [token for token, _ in keyword_counts(text).most_common(top_k)]
 
 
 def summarize_sections(sections: Iterable[Tuple[str, str]], max_sentences: int = 3) -> str:
     sentences: List[str] = []
     for _, body in sections:
+        if len(sentences) >= max_sentences:
+            break
         for sentence in re.split(r"(?<=[.!?])\s+", body.strip()):
             if sentence:
                 sentences.append(sentence.strip())
@@ -0,0 +1,87 @@
+"""Standalone analysis worker.
+
+Run ``python -m app.worker`` next to API processes started with
+``PAPERHELPER_INLINE_ANALYSIS=false``. Workers share the job queue and record
+store under ``PAPERHELPER_STORAGE_PATH`` and can be scaled independently of the
+web tier.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import threading
+from typing import List, Optional
+
+from .config import get_settings
+from .pipeline import ApplicationContext, drain_jobs, recover_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(
+    context: ApplicationContext,
+    poll_interval: float = 1.0,
+    once: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """Pull jobs from the shared queue until ``stop`` is set; return the number of jobs processed."""
+
+    stop = stop or threading.Event()
+    recover_jobs(context)
+    processed = 0
+    while not stop.is_set():
+        processed += drain_jobs(context, schedule_retries=False, stop=stop)
+        if once:
+            break
+        stop.wait(poll_interval)
+    return processed
+
+
+def _worker_main(poll_interval: float, once: bool) -> int:
+    stop = threading.Event()
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        logger.info("Received signal %d, stopping after the current job", signum)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    context = ApplicationContext(get_settings())
+    return run_worker(context, poll_interval=poll_interval, once=once, stop=stop)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Run PaperHelper analysis workers.")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to run on this machine.")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+    parser.add_argument("--once", action="store_true", help="Drain the ready jobs and exit.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+    if args.processes <= 1:
+        _worker_main(args.poll_interval, args.once)
+        return 0
+
+    import multiprocessing
+
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(args.poll_interval, args.once), name=f"worker-{idx}")
+        for idx in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+    return max((worker.exitcode or 0) for worker in workers)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+from ..budget import WorkPlan, sample_sections
+from ..llm import LLMClient, LLMError, ResponseCache, pack_chunks
+from ..metrics import registry
 from ..models import DocumentArtifacts, GlossaryEntry, MindMap, MindMapEdge, MindMapNode
 from ..utils import build_embedding, extract_keywords, summarize_sections
+from .summarization import (
+    SUMMARY_SYSTEM_PROMPT,
+    extractive_summarizer,
+    llm_summarizer,
+    merge_prompt,
+    summary_prompt,
+)
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODES = {"flat", "hierarchical", "auto"}
+GLOSSARY_SYSTEM_PROMPT = "You write one-sentence glossary definitions for terms used in academic papers."
 
 
 @dataclass
@@ -13,6 +30,10 @@ class WorkflowState:
     filename: str
     sections: List[Tuple[str, str]]
     embeddings: List[List[float]] | None = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    plan: WorkPlan = field(default_factory=WorkPlan)
+    deadline: Optional[float] = None
+    degraded: List[str] = field(default_factory=list)
 
 
 class IngestionNode:
@@ -31,17 +52,72 @@ class EmbeddingNode:
 
 
 class SummaryNode:
-    def run(self, sections: Iterable[Tuple[str, str]]) -> str:
-        return summarize_sections(sections)
+    """Summarize flat for short papers and through a map-reduce tree for long ones.
+
+    ``mode`` is ``"flat"``, ``"hierarchical"`` or ``"auto"`` (the LLM tree once there are more
+    than ``fan_in`` sections). Without an LLM, ``auto`` keeps the flat extractive summary: the
+    extractive tree merges first sentences of word-window chunks and reads worse. The
+    extractive tree, used only in ``"hierarchical"`` mode, caches in memory so its cheap
+    intermediates never reach ``cache`` on disk.
+    """
+
+    def __init__(
+        self,
+        llm: Optional[LLMClient] = None,
+        mode: str = "auto",
+        fan_in: int = 4,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        if mode not in SUMMARY_MODES:
+            raise ValueError(f"Unknown summary mode: {mode}")
+        self.llm = llm
+        self.mode = mode
+        self.fan_in = fan_in
+        self.cache = cache
+        self._extractive_cache = ResponseCache()
+
+    def run(self, sections: Iterable[Tuple[str, str]], max_sentences: int = 3, use_llm: bool = True) -> str:
+        sections = list(sections)
+        llm = self.llm if use_llm else None
+        if self.mode == "hierarchical" or (self.mode == "auto" and llm is not None and len(sections) > self.fan_in):
+            return self._summarize_tree(llm, sections)
+        if llm is None:
+            return summarize_sections(sections, max_sentences)
+        try:
+            return self._summarize_with_llm(llm, sections)
+        except LLMError:
+            logger.warning("LLM summary failed; falling back to extractive summary", exc_info=True)
+            return summarize_sections(sections, max_sentences)
+
+    def _summarize_tree(self, llm: Optional[LLMClient], sections: List[Tuple[str, str]]) -> str:
+        if llm is not None:
+            try:
+                return llm_summarizer(llm, self.fan_in, self.cache).summarize(sections)
+            except LLMError:
+                logger.warning("LLM summary tree failed; falling back to extractive tree", exc_info=True)
+        return extractive_summarizer(self.fan_in, self._extractive_cache).summarize(sections)
+
+    @staticmethod
+    def _summarize_with_llm(llm: LLMClient, sections: List[Tuple[str, str]]) -> str:
+        blocks = [f"## {title}\n{body}" for title, body in sections]
+        chunks = pack_chunks(blocks, llm.prompt_token_budget)
+        partials = llm.complete_many([summary_prompt(chunk) for chunk in chunks], system=SUMMARY_SYSTEM_PROMPT)
+        if len(partials) == 1:
+            return partials[0].strip()
+        return llm.complete(merge_prompt(partials), system=SUMMARY_SYSTEM_PROMPT).strip()
 
 
 class MindMapBuilderNode:
-    def run(self, sections: Iterable[Tuple[str, str]]) -> MindMap:
-        keywords = extract_keywords(" ".join(body for _, body in sections), top_k=12)
+    def run(
+        self, sections: Iterable[Tuple[str, str]], max_keywords: int = 12, max_edges: Optional[int] = None
+    ) -> MindMap:
+        keywords = extract_keywords(" ".join(body for _, body in sections), top_k=max_keywords)
         nodes = [MindMapNodeModel(keyword, idx) for idx, keyword in enumerate(keywords, start=1)]
         edges: List[MindMapEdge] = []
         for idx, source in enumerate(nodes):
             for target in nodes[idx + 1 : idx + 1 + 3]:
+                if max_edges is not None and len(edges) >= max_edges:
+                    break
                 edges.append(MindMapEdge(source=source.id, target=target.id, weight=0.5))
         return MindMap(nodes=[node.to_dataclass() for node in nodes], edges=edges)
 
@@ -60,8 +136,12 @@ class MindMapNodeModel:
 
 
 class GlossaryNode:
-    def run(self, sections: Iterable[Tuple[str, str]]) -> List[GlossaryEntry]:
-        keywords = extract_keywords(" ".join(body for _, body in sections), top_k=8)
+    def __init__(self, llm: Optional[LLMClient] = None) -> None:
+        self.llm = llm
+
+    def run(self, sections: Iterable[Tuple[str, str]], max_terms: int = 8, use_llm: bool = True) -> List[GlossaryEntry]:
+        sections = list(sections)
+        keywords = extract_keywords(" ".join(body for _, body in sections), top_k=max_terms)
         glossary: List[GlossaryEntry] = []
         for keyword in keywords:
             references = [title for title, body in sections if keyword in body.lower()][:2]
@@ -73,8 +153,22 @@ class GlossaryNode:
                     references=references,
                 )
             )
+        if self.llm is not None and use_llm and glossary:
+            self._define_with_llm(self.llm, glossary, sections)
         return glossary
 
+    @staticmethod
+    def _define_with_llm(llm: LLMClient, glossary: List[GlossaryEntry], sections: List[Tuple[str, str]]) -> None:
+        prompts = [_definition_prompt(entry.term, _term_context(entry.term.lower(), sections)) for entry in glossary]
+        try:
+            definitions = llm.complete_many(prompts, system=GLOSSARY_SYSTEM_PROMPT)
+        except LLMError:
+            logger.warning("LLM glossary definitions failed; keeping heuristic definitions", exc_info=True)
+            return
+        for entry, definition in zip(glossary, definitions):
+            if definition.strip():
+                entry.definition = definition.strip()
+
 
 class SynthesisNode:
     def run(self, summary: str, mind_map: MindMap, glossary: List[GlossaryEntry]) -> DocumentArtifacts:
@@ -82,24 +176,96 @@ class SynthesisNode:
 
 
 class PaperAnalysisWorkflow:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        llm: Optional[LLMClient] = None,
+        summary_mode: str = "auto",
+        summary_fan_in: int = 4,
+        summary_cache: Optional[ResponseCache] = None,
+    ) -> None:
         self.ingestion = IngestionNode()
         self.chunking = ChunkingNode()
         self.embedding = EmbeddingNode()
-        self.summary = SummaryNode()
+        self.summary = SummaryNode(llm, mode=summary_mode, fan_in=summary_fan_in, cache=summary_cache)
         self.mind_map = MindMapBuilderNode()
-        self.glossary = GlossaryNode()
+        self.glossary = GlossaryNode(llm)
         self.synthesis = SynthesisNode()
+        self.llm = llm
 
     def run(self, state: WorkflowState) -> DocumentArtifacts:
-        sections = self.ingestion.run(state.sections)
-        sections = self.chunking.run(sections)
-        embeddings = self.embedding.run(sections)
-        summary = self.summary.run(sections)
-        mind_map = self.mind_map.run(sections)
-        glossary = self.glossary.run(sections)
+        if self.llm is None:
+            return self._run(state)
+        with self.llm.deadline(state.deadline):
+            return self._run(state)
+
+    def _run(self, state: WorkflowState) -> DocumentArtifacts:
+        plan = state.plan
+        sections = self._stage(state, "ingestion", self.ingestion.run, state.sections)
+        sections = self._stage(state, "chunking", self.chunking.run, sections)
+        embeddings = self._stage(state, "embedding", self.embedding.run, sections)
+        summary = self._stage(
+            state,
+            "summary",
+            self.summary.run,
+            sample_sections(sections, plan.max_sections),
+            max_sentences=plan.max_sentences,
+            use_llm=self._llm_allowed(state, "summary"),
+        )
+        self._note_cutoff(state, "summary")
+        mind_map = self._stage(
+            state, "mind_map", self.mind_map.run, sections, max_keywords=plan.max_keywords, max_edges=plan.max_edges
+        )
+        glossary = self._stage(
+            state,
+            "glossary",
+            self.glossary.run,
+            sections,
+            max_terms=plan.max_terms,
+            use_llm=self._llm_allowed(state, "glossary"),
+        )
+        self._note_cutoff(state, "glossary")
         state.embeddings = embeddings
-        return self.synthesis.run(summary, mind_map, glossary)
+        return self._stage(state, "synthesis", self.synthesis.run, summary, mind_map, glossary)
+
+    def _llm_allowed(self, state: WorkflowState, stage: str) -> bool:
+        """Only start LLM work when a full request timeout still fits before the deadline.
+
+        Otherwise the stage falls back to its offline heuristic and is recorded in ``state.degraded``.
+        """
+
+        if self.llm is None or state.deadline is None:
+            return True
+        if state.deadline - time.perf_counter() >= self.llm.timeout:
+            return True
+        state.degraded.append(stage)
+        return False
+
+    def _note_cutoff(self, state: WorkflowState, stage: str) -> None:
+        """Record an LLM stage that ran into the deadline; the client aborted it and the node fell back."""
+
+        if self.llm is None or state.deadline is None or stage in state.degraded:
+            return
+        if time.perf_counter() >= state.deadline:
+            state.degraded.append(stage)
+
+    @staticmethod
+    def _stage(state: WorkflowState, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with registry.timer("paperhelper_stage_seconds", stage=name) as timing:
+            result = func(*args, **kwargs)
+        state.timings[name] = timing["seconds"]
+        return result
+
+
+def _definition_prompt(term: str, context: str) -> str:
+    return f"Define the term \"{term}\" in one sentence, as it is used in this excerpt.\n\nExcerpt:\n{context}"
+
+
+def _term_context(keyword: str, sections: List[Tuple[str, str]], window: int = 300) -> str:
+    for _, body in sections:
+        position = body.lower().find(keyword)
+        if position >= 0:
+            return body[max(0, position - window) : position + len(keyword) + window]
+    return ""
 
 
 __all__ = ["PaperAnalysisWorkflow", "WorkflowState"]
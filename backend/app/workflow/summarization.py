@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..llm import LLMClient, ResponseCache, pack_chunks
+from ..utils import summarize_sections
+
+BatchSummarizer = Callable[[List[str]], List[str]]
+
+SUMMARY_SYSTEM_PROMPT = "You summarize academic papers accurately and concisely. Answer in plain prose."
+
+
+def summary_prompt(content: str) -> str:
+    return f"Summarize the following part of a paper in at most five sentences.\n\n{content}"
+
+
+def merge_prompt(partials: Sequence[str]) -> str:
+    joined = "\n\n".join(f"- {partial.strip()}" for partial in partials)
+    return f"Combine these partial summaries of one paper into a single summary of at most six sentences.\n\n{joined}"
+
+
+@dataclass
+class SummaryTreeStats:
+    depth: int = 0
+    computed: int = 0
+    cached: int = 0
+
+
+class HierarchicalSummarizer:
+    """Map-reduce summarization over a bounded fan-in tree.
+
+    Every section is summarized independently (map), then groups of at most ``fan_in``
+    partial summaries are merged level by level (reduce) until one remains. Each level is
+    handed to the batch function in one call, so with a concurrent backend latency grows
+    with tree depth rather than section count. Intermediate summaries are cached by the
+    hash of their input, so re-analysing an edited paper only recomputes changed branches.
+    """
+
+    def __init__(
+        self,
+        map_batch: BatchSummarizer,
+        reduce_batch: BatchSummarizer,
+        fan_in: int = 4,
+        cache: Optional[ResponseCache] = None,
+        namespace: str = "extractive",
+    ) -> None:
+        if fan_in < 2:
+            raise ValueError("fan_in must be at least 2")
+        self.map_batch = map_batch
+        self.reduce_batch = reduce_batch
+        self.fan_in = fan_in
+        self.cache = cache
+        self.namespace = namespace
+        self.stats = SummaryTreeStats()
+
+    def summarize(self, sections: Sequence[Tuple[str, str]]) -> str:
+        self.stats = SummaryTreeStats()
+        if not sections:
+            return ""
+        level = self._run_level("map", [f"## {title}\n{body}" for title, body in sections], self.map_batch)
+        while len(level) > 1:
+            groups = [level[idx : idx + self.fan_in] for idx in range(0, len(level), self.fan_in)]
+            level = self._run_level("reduce", ["\x1f".join(group) for group in groups], self.reduce_batch)
+            self.stats.depth += 1
+        return level[0]
+
+    def _run_level(self, phase: str, inputs: List[str], batch: BatchSummarizer) -> List[str]:
+        keys = [(f"{phase}:{self.namespace}", hashlib.sha256(text.encode("utf-8")).hexdigest()) for text in inputs]
+        results: Dict[int, str] = {}
+        missing: List[int] = []
+        for idx, key in enumerate(keys):
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is None:
+                missing.append(idx)
+            else:
+                results[idx] = cached
+        if missing:
+            outputs = batch([inputs[idx] for idx in missing])
+            for idx, output in zip(missing, outputs):
+                results[idx] = output
+                if self.cache is not None:
+                    self.cache.put(keys[idx], output)
+        self.stats.computed += len(missing)
+        self.stats.cached += len(inputs) - len(missing)
+        return [results[idx] for idx in range(len(inputs))]
+
+
+def extractive_summarizer(fan_in: int = 4, cache: Optional[ResponseCache] = None) -> HierarchicalSummarizer:
+    """Offline tree: sections keep their leading sentences and each merge keeps one sentence per child."""
+
+    def map_batch(texts: List[str]) -> List[str]:
+        bodies = [_drop_leading_fragment(_strip_heading(text)) for text in texts]
+        return [summarize_sections([("", body)], max_sentences=2) for body in bodies]
+
+    def reduce_batch(groups: List[str]) -> List[str]:
+        return [" ".join(_first_sentence(child) for child in group.split("\x1f") if child) for group in groups]
+
+    return HierarchicalSummarizer(map_batch, reduce_batch, fan_in=fan_in, cache=cache, namespace="extractive")
+
+
+def llm_summarizer(llm: LLMClient, fan_in: int = 4, cache: Optional[ResponseCache] = None) -> HierarchicalSummarizer:
+    def map_batch(texts: List[str]) -> List[str]:
+        # Each section is its own map unit so cache keys follow section content; oversized ones are truncated.
+        prompts = [summary_prompt(pack_chunks([text], llm.prompt_token_budget)[0]) for text in texts]
+        return [result.strip() for result in llm.complete_many(prompts, system=SUMMARY_SYSTEM_PROMPT)]
+
+    def reduce_batch(groups: List[str]) -> List[str]:
+        prompts = [merge_prompt(group.split("\x1f")) for group in groups]
+        return [result.strip() for result in llm.complete_many(prompts, system=SUMMARY_SYSTEM_PROMPT)]
+
+    return HierarchicalSummarizer(map_batch, reduce_batch, fan_in=fan_in, cache=cache, namespace=f"llm:{llm.model}")
+
+
+def _strip_heading(text: str) -> str:
+    return text.split("\n", 1)[1] if text.startswith("## ") and "\n" in text else text
+
+
+def _drop_leading_fragment(text: str) -> str:
+    """Skip the partial sentence a word-window chunk starts with, when it visibly starts mid-sentence."""
+
+    text = text.lstrip()
+    if not text or text[0].isupper() or text[0] in "#\"'([":
+        return text
+    parts = re.split(r"(?<=[.!?])\s+", text, maxsplit=1)
+    return parts[1] if len(parts) == 2 else text
+
+
+def _first_sentence(text: str) -> str:
+    return re.split(r"(?<=[.!?])\s+", text.strip(), maxsplit=1)[0]
+
+
+__all__ = [
+    "HierarchicalSummarizer",
+    "SummaryTreeStats",
+    "extractive_summarizer",
+    "llm_summarizer",
+    "merge_prompt",
+    "summary_prompt",
+]
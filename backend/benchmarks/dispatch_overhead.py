@@ -0,0 +1,65 @@
+"""Measure per-request dispatch overhead of the bundled FastAPI shim as the route table grows.
+
+Usage::
+
+    python benchmarks/dispatch_overhead.py [--requests 20000] [--sizes 10 100 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import Depends, FastAPI  # noqa: E402
+
+
+def _dependency() -> str:
+    return "context"
+
+
+def build_app(route_count: int) -> FastAPI:
+    app = FastAPI()
+    for idx in range(route_count):
+
+        async def static_handler() -> dict:
+            return {}
+
+        async def param_handler(doc_id: str, limit: int = 10, context: str = Depends(_dependency)) -> dict:
+            return {"doc_id": doc_id}
+
+        app.get(f"/api/resource-{idx}/items")(static_handler)
+        app.get(f"/api/resource-{idx}/items/{{doc_id}}/detail")(param_handler)
+    return app
+
+
+def time_dispatch(app: FastAPI, path: str, requests: int) -> float:
+    app._call_route("GET", path, {})
+    start = time.perf_counter()
+    for _ in range(requests):
+        app._call_route("GET", path, {})
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'routes':>8} {'static us/req':>14} {'param us/req':>14}")
+    for size in args.sizes:
+        app = build_app(size)
+        # The last registered routes are the worst case for a linear scan.
+        last = size - 1
+        static_us = time_dispatch(app, f"/api/resource-{last}/items", args.requests)
+        param_us = time_dispatch(app, f"/api/resource-{last}/items/abc123/detail?limit=5", args.requests)
+        print(f"{size * 2:>8} {static_us:>14.2f} {param_us:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""Report ``python -X importtime`` costs for the API and worker entry points.
+
+Usage::
+
+    python benchmarks/importtime_report.py [--top 15] [--budget-ms 300] [module ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_MODULES = ["app.main", "app.worker"]
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure(module: str) -> List[ImportTiming]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: List[ImportTiming] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+    return timings
+
+
+def report(module: str, top: int) -> int:
+    timings = measure(module)
+    root = next(timing for timing in reversed(timings) if timing.module == module)
+    print(f"{module}: {root.cumulative_us / 1000:.1f} ms cumulative")
+    for timing in sorted(timings, key=lambda item: item.cumulative_us, reverse=True)[1 : top + 1]:
+        print(f"  {timing.cumulative_us / 1000:8.1f} ms  {timing.self_us / 1000:7.1f} ms self  {timing.module}")
+    return root.cumulative_us
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Exit non-zero if a module exceeds this.")
+    args = parser.parse_args()
+
+    over_budget = False
+    for module in args.modules:
+        cumulative_us = report(module, args.top)
+        if args.budget_ms is not None and cumulative_us / 1000 > args.budget_ms:
+            print(f"  !! exceeds budget of {args.budget_ms:.0f} ms")
+            over_budget = True
+        print()
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from __future__ import annotations
-
 import asyncio
 import inspect
+import threading
+import weakref
 from collections import defaultdict
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_args
 
 from .background import BackgroundTasks
 from .dependencies import Depends
@@ -14,30 +16,102 @@ from .dependencies import Depends
 Handler = Callable[..., Any]
 Route = Tuple[str, str, Handler]
 
-
-def _paths_match(pattern: str, path: str) -> bool:
-    if pattern == path:
-        return True
-    pattern_parts = pattern.strip("/").split("/")
-    path_parts = path.strip("/").split("/")
-    if len(pattern_parts) != len(path_parts):
-        return False
-    for p_part, actual in zip(pattern_parts, path_parts):
-        if p_part.startswith("{") and p_part.endswith("}"):
-            continue
-        if p_part != actual:
-            return False
-    return True
+_EMPTY = inspect.Parameter.empty
+
+
+def _split_path(path: str) -> List[str]:
+    return path.strip("/").split("/")
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if isinstance(annotation, str):
+        name = annotation.replace(" ", "")
+        if name.startswith("Optional[") and name.endswith("]"):
+            return name[len("Optional[") : -1]
+        return name.replace("|None", "").replace("None|", "")
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    return args[0] if len(args) == 1 and len(get_args(annotation)) == 2 else annotation
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    annotation = _unwrap_optional(annotation)
+    if annotation in (bool, "bool"):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    if annotation in (int, "int"):
+        return int(value)
+    if annotation in (float, "float"):
+        return float(value)
+    return value
+
+
+@dataclass
+class _RouteNode:
+    """One path segment in a method's route trie; ``{name}`` segments share the ``param`` child."""
+
+    static: Dict[str, _RouteNode] = field(default_factory=dict)
+    param: Optional[_RouteNode] = None
+    handler: Optional[Handler] = None
+    param_names: Tuple[str, ...] = ()
+
+    def insert(self, segments: List[str], handler: Handler) -> None:
+        node = self
+        names: List[str] = []
+        for segment in segments:
+            if segment.startswith("{") and segment.endswith("}"):
+                names.append(segment[1:-1])
+                if node.param is None:
+                    node.param = _RouteNode()
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _RouteNode())
+        if node.handler is None:
+            node.handler = handler
+            node.param_names = tuple(names)
+
+    def match(self, segments: List[str], index: int, values: List[str]) -> Optional[_RouteNode]:
+        if index == len(segments):
+            return self if self.handler is not None else None
+        segment = segments[index]
+        child = self.static.get(segment)
+        if child is not None:
+            found = child.match(segments, index + 1, values)
+            if found is not None:
+                return found
+        if self.param is not None:
+            values.append(segment)
+            found = self.param.match(segments, index + 1, values)
+            if found is not None:
+                return found
+            values.pop()
+        return None
 
 
-def _extract_params(pattern: str, path: str) -> Dict[str, str]:
-    params: Dict[str, str] = {}
-    pattern_parts = pattern.strip("/").split("/")
-    path_parts = path.strip("/").split("/")
-    for p_part, actual in zip(pattern_parts, path_parts):
-        if p_part.startswith("{") and p_part.endswith("}"):
-            params[p_part[1:-1]] = actual
-    return params
+@dataclass(frozen=True)
+class _ParamPlan:
+    name: str
+    annotation: Any
+    default: Any
+    is_background: bool
+    dependency: Optional[Depends]
+
+
+def _build_plan(handler: Handler) -> Tuple[_ParamPlan, ...]:
+    plan: List[_ParamPlan] = []
+    for name, parameter in inspect.signature(handler).parameters.items():
+        annotation = parameter.annotation
+        default = parameter.default
+        plan.append(
+            _ParamPlan(
+                name=name,
+                annotation=annotation,
+                default=default,
+                is_background=annotation is BackgroundTasks or annotation == "BackgroundTasks",
+                dependency=default if isinstance(default, Depends) else None,
+            )
+        )
+    return tuple(plan)
 
 
 class FastAPI:
@@ -47,19 +121,35 @@ class FastAPI:
         self.routes: List[Tuple[str, str, Handler]] = []
         self.dependency_overrides: Dict[Callable[..., Any], Callable[..., Any]] = {}
         self._event_handlers: Dict[str, list[Callable[[], Any]]] = defaultdict(list)
+        self._static_routes: Dict[Tuple[str, str], Handler] = {}
+        self._route_tries: Dict[str, _RouteNode] = defaultdict(_RouteNode)
+        # Keyed weakly so per-test dependency overrides do not accumulate.
+        self._plans: weakref.WeakKeyDictionary[Handler, Tuple[_ParamPlan, ...]] = weakref.WeakKeyDictionary()
+        self._loops = threading.local()
 
     def add_api_route(self, path: str, endpoint: Handler, methods: list[str]) -> None:
+        segments = _split_path(path)
+        is_static = not any(segment.startswith("{") and segment.endswith("}") for segment in segments)
         for method in methods:
-            self.routes.append((method.upper(), path, endpoint))
-
-    def post(self, path: str, response_model: Any | None = None) -> Callable[[Handler], Handler]:
+            method = method.upper()
+            self.routes.append((method, path, endpoint))
+            if is_static:
+                self._static_routes.setdefault((method, "/".join(segments)), endpoint)
+            else:
+                self._route_tries[method].insert(segments, endpoint)
+
+    def post(
+        self, path: str, response_model: Any | None = None, response_class: Any | None = None
+    ) -> Callable[[Handler], Handler]:
         def decorator(func: Handler) -> Handler:
             self.add_api_route(path, func, ["POST"])
             return func
 
         return decorator
 
-    def get(self, path: str, response_model: Any | None = None) -> Callable[[Handler], Handler]:
+    def get(
+        self, path: str, response_model: Any | None = None, response_class: Any | None = None
+    ) -> Callable[[Handler], Handler]:
         def decorator(func: Handler) -> Handler:
             self.add_api_route(path, func, ["GET"])
             return func
@@ -77,18 +167,29 @@ class FastAPI:
         return None
 
     def _get_handler(self, method: str, path: str) -> tuple[Handler, Dict[str, str]]:
-        for registered_method, pattern, handler in self.routes:
-            if registered_method != method.upper():
-                continue
-            if _paths_match(pattern, path):
-                return handler, _extract_params(pattern, path)
-        raise LookupError(f"Route not found for {method} {path}")
+        method = method.upper()
+        segments = _split_path(path)
+        handler = self._static_routes.get((method, "/".join(segments)))
+        if handler is not None:
+            return handler, {}
+        trie = self._route_tries.get(method)
+        values: List[str] = []
+        node = trie.match(segments, 0, values) if trie is not None else None
+        if node is None or node.handler is None:
+            raise LookupError(f"Route not found for {method} {path}")
+        return node.handler, dict(zip(node.param_names, values))
+
+    def _plan_for(self, handler: Handler) -> Tuple[_ParamPlan, ...]:
+        plan = self._plans.get(handler)
+        if plan is None:
+            plan = self._plans[handler] = _build_plan(handler)
+        return plan
 
     def _resolve_dependency(self, dependency: Depends) -> Any:
         callable_obj = dependency.dependency
         override = self.dependency_overrides.get(callable_obj)
         target = override or callable_obj
-        return target()
+        return target(**self._build_kwargs(target, {}))
 
     async def _execute(self, handler: Handler, kwargs: Dict[str, Any]) -> Any:
         result = handler(**kwargs)
@@ -98,28 +199,40 @@ class FastAPI:
 
     def _build_kwargs(self, handler: Handler, request_data: Dict[str, Any]) -> Dict[str, Any]:
         kwargs: Dict[str, Any] = {}
-        signature = inspect.signature(handler)
-        for name, parameter in signature.parameters.items():
-            annotation = parameter.annotation
-            if annotation is BackgroundTasks or annotation == "BackgroundTasks":
-                kwargs[name] = BackgroundTasks()
-                continue
-            if isinstance(parameter.default, Depends):
-                kwargs[name] = self._resolve_dependency(parameter.default)
-                continue
-            if name in request_data:
-                kwargs[name] = request_data[name]
-            elif parameter.default is not inspect._empty:
-                kwargs[name] = parameter.default
+        for param in self._plan_for(handler):
+            if param.is_background:
+                kwargs[param.name] = BackgroundTasks()
+            elif param.dependency is not None:
+                kwargs[param.name] = self._resolve_dependency(param.dependency)
+            elif param.name in request_data:
+                kwargs[param.name] = _coerce(request_data[param.name], param.annotation)
+            elif param.default is not _EMPTY:
+                kwargs[param.name] = param.default
         return kwargs
 
+    def _run(self, awaitable: Any) -> Any:
+        """Run ``awaitable`` on this thread's persistent loop, then let tasks it spawned finish."""
+
+        loop: Optional[asyncio.AbstractEventLoop] = getattr(self._loops, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = self._loops.loop = asyncio.new_event_loop()
+        result = loop.run_until_complete(awaitable)
+        pending = asyncio.all_tasks(loop)
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        return result
+
     def trigger_event(self, event_type: str) -> None:
         for handler in self._event_handlers.get(event_type, []):
-            handler()
+            result = handler()
+            if inspect.isawaitable(result):
+                self._run(result)
 
     def _call_route(self, method: str, path: str, request_data: Dict[str, Any]) -> Any:
+        path, _, query = path.partition("?")
         handler, path_params = self._get_handler(method, path)
-        all_data = dict(request_data)
+        all_data = dict(parse_qsl(query)) if query else {}
+        all_data.update(request_data)
         all_data.update(path_params)
         kwargs = self._build_kwargs(handler, all_data)
-        return asyncio.run(self._execute(handler, kwargs))
+        return self._run(self._execute(handler, kwargs))
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+class Response:
+    media_type: Optional[str] = None
+    charset = "utf-8"
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+    ) -> None:
+        self.status_code = status_code
+        if media_type is not None:
+            self.media_type = media_type
+        self.headers: Dict[str, str] = dict(headers or {})
+        self.body = self.render(content)
+
+    def render(self, content: Any) -> bytes:
+        if content is None:
+            return b""
+        if isinstance(content, bytes):
+            return content
+        return str(content).encode(self.charset)
+
+
+class PlainTextResponse(Response):
+    media_type = "text/plain"
+
+
+class FileResponse(Response):
+    def __init__(
+        self,
+        path: Union[str, Path],
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.filename = filename
+        headers = dict(headers or {})
+        if filename:
+            headers.setdefault("content-disposition", f'attachment; filename="{filename}"')
+        super().__init__(self.path.read_bytes(), status_code=status_code, headers=headers, media_type=media_type)
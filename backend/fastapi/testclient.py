@@ -4,9 +4,11 @@ import io
 import json
 from dataclasses import dataclass, is_dataclass
 from typing import Any, Dict, Optional
+from urllib.parse import urlencode
 
 from .applications import FastAPI
 from .exceptions import HTTPException
+from .responses import Response as HTTPResponse
 from .uploads import UploadFile
 
 
@@ -14,10 +16,17 @@ from .uploads import UploadFile
 class Response:
     status_code: int
     data: Any
+    content: bytes = b""
 
     def json(self) -> Any:
         return self.data
 
+    @property
+    def text(self) -> str:
+        if isinstance(self.data, str):
+            return self.data
+        return json.dumps(self.data)
+
 
 class TestClient:
     def __init__(self, app: FastAPI):
@@ -28,7 +37,9 @@ class TestClient:
         path: str,
         files: Optional[Dict[str, tuple[str, Any, Optional[str]]]] = None,
         json_body: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
     ) -> Response:
+        path = _with_query(path, params)
         request_data: Dict[str, Any] = {}
         if files:
             name, payload = next(iter(files.items()))
@@ -46,15 +57,30 @@ class TestClient:
             status_code = 200
         except HTTPException as exc:  # pragma: no cover - not expected in tests
             return Response(status_code=exc.status_code, data={"detail": exc.detail})
-        return Response(status_code=status_code, data=_serialize(result))
+        return _build_response(status_code, result)
 
-    def get(self, path: str) -> Response:
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Response:
+        path = _with_query(path, params)
         try:
             result = self.app._call_route("GET", path, {})
             status_code = 200
         except HTTPException as exc:  # pragma: no cover
             return Response(status_code=exc.status_code, data={"detail": exc.detail})
-        return Response(status_code=status_code, data=_serialize(result))
+        return _build_response(status_code, result)
+
+
+def _build_response(status_code: int, result: Any) -> Response:
+    if isinstance(result, HTTPResponse):
+        text = result.body.decode(result.charset, errors="replace")
+        return Response(status_code=result.status_code, data=text, content=result.body)
+    return Response(status_code=status_code, data=_serialize(result))
+
+
+def _with_query(path: str, params: Optional[Dict[str, Any]]) -> str:
+    if not params:
+        return path
+    separator = "&" if "?" in path else "?"
+    return f"{path}{separator}{urlencode(params)}"
 
 
 def _serialize(data: Any) -> Any:
@@ -0,0 +1,43 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from app.config import Settings
+from app.models import DocumentRecord, DocumentStatus
+from app.pipeline import ApplicationContext
+
+PAPER_TEXT = "# Title\nMachine learning improves research outcomes."
+
+
+@pytest.fixture
+def make_context(tmp_path: Path) -> Callable[..., ApplicationContext]:
+    """Build an ``ApplicationContext`` stored under ``tmp_path``; keyword arguments override settings."""
+
+    def _make(**overrides) -> ApplicationContext:
+        return ApplicationContext(Settings(storage_path=tmp_path, **overrides))
+
+    return _make
+
+
+@pytest.fixture
+def add_document() -> Callable[..., Path]:
+    """Write an upload to ``<storage>/<doc_id>/<filename>`` and save its record; returns the upload path."""
+
+    def _add(
+        context: ApplicationContext,
+        doc_id: str = "doc1",
+        text: str = PAPER_TEXT,
+        filename: str = "paper.md",
+        status: DocumentStatus = DocumentStatus.PROCESSING,
+        **fields,
+    ) -> Path:
+        path = context.settings.storage_path / doc_id / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        context.storage.save_record(
+            DocumentRecord(id=doc_id, filename=filename, storage_path=path, status=status, **fields)
+        )
+        return path
+
+    return _add
@@ -0,0 +1,72 @@
+import time
+
+from app.budget import MAX_CHUNK_WORDS, WorkPlan, plan_work, sample_sections
+from app.llm import LLMClient
+from app.pipeline import analyze_document
+from app.utils import _split_into_sections
+from app.workflow.nodes import MindMapBuilderNode, PaperAnalysisWorkflow, WorkflowState
+
+
+def test_plan_scales_chunks_with_document_size():
+    for words in (800, 1_500, 3_300, 4_000):
+        plan = plan_work(words, time_budget_seconds=300)
+        assert len(_split_into_sections("word " * words, plan.chunk_size, plan.overlap)) == 4
+    assert plan_work(2_000, time_budget_seconds=300, fan_in=2).chunk_size > plan_work(2_000, 300).chunk_size
+    assert plan_work(100, time_budget_seconds=300).chunk_size == 200
+
+    paper = plan_work(6_000, time_budget_seconds=300)
+    assert (paper.chunk_size, paper.overlap) == (1200, 150)
+
+    thesis = plan_work(150_000, time_budget_seconds=300, section_seconds=15)
+    assert thesis.max_sections == 16
+    assert thesis.chunk_size == MAX_CHUNK_WORDS
+    assert plan_work(150_000, time_budget_seconds=0).max_sections == 256
+
+
+def test_plan_scales_node_limits_with_sections_and_budget():
+    paper, book = plan_work(800, time_budget_seconds=300), plan_work(40_000, time_budget_seconds=0)
+    assert (paper.max_sentences, paper.max_keywords, paper.max_terms) == (3, 12, 8)
+    assert book.max_sentences > paper.max_sentences and book.max_keywords > paper.max_keywords
+    assert book.max_terms > plan_work(40_000, time_budget_seconds=300, section_seconds=15).max_terms
+
+    terms = "graphs nodes edges paths trees forests cycles walks cliques colors flows cuts matchings".split()
+    sections = [(f"Part {idx}", " ".join(terms)) for idx in range(4)]
+    mind_map = MindMapBuilderNode().run(sections, max_keywords=paper.max_keywords, max_edges=paper.max_edges)
+    assert len(mind_map.nodes) == 12 and len(mind_map.edges) == paper.max_edges < 3 * 12 - 6
+
+
+def test_sample_sections_keeps_ends():
+    assert sample_sections(list(range(10)), 4) == [0, 3, 6, 9]
+    assert sample_sections([1, 2], 4) == [1, 2]
+
+
+def test_workflow_skips_llm_past_deadline():
+    llm = LLMClient("http://127.0.0.1:9", "unreachable", timeout=30)
+    sections = [(f"Part {idx}", f"Sentence {idx} about graph learning systems.") for idx in range(12)]
+    state = WorkflowState(
+        document_id="doc",
+        filename="doc.md",
+        sections=sections,
+        plan=WorkPlan(max_sections=5, max_keywords=3, max_edges=2),
+        deadline=time.perf_counter() + 5,
+    )
+    artifacts = PaperAnalysisWorkflow(llm=llm).run(state)
+
+    assert state.degraded == ["summary", "glossary"]
+    assert artifacts.summary.startswith("Sentence 0")
+    assert len(artifacts.mind_map.nodes) == 3 and len(artifacts.mind_map.edges) == 2
+    assert artifacts.glossary[0].definition.startswith("Key concept")
+
+
+def test_analysis_records_plan_and_stores_rechunked_text(make_context, add_document):
+    context = make_context(job_time_budget_seconds=60)
+    path = add_document(context, "doc", "Short abstract sentence. " * 200, filename="abstract.md")
+
+    analyze_document("doc", path, context)
+
+    metadata = context.storage.get_record("doc").metadata
+    assert metadata["plan.chunk_size"] == "200"
+    assert metadata["plan.time_budget_seconds"] == "60"
+    assert metadata["plan.degraded"] == ""
+    stored = context.texts.load_parsed("doc")
+    assert stored.chunk_size == 200 and len(stored.sections) == 4
@@ -0,0 +1,114 @@
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.jobs import JobQueue, JobStatus, _lease_abandoned, worker_identity
+from app.models import DocumentStatus
+from app.pipeline import drain_jobs, recover_jobs
+
+
+def test_lease_prefers_small_documents(tmp_path: Path):
+    queue = JobQueue(tmp_path / "jobs.json")
+    queue.enqueue("thesis", tmp_path / "thesis.pdf", priority=50_000_000)
+    queue.enqueue("abstract", tmp_path / "abstract.md", priority=2_000)
+
+    job = queue.lease("worker-1")
+    assert job.id == "abstract"
+    assert job.status == JobStatus.LEASED
+    assert queue.lease("worker-1").id == "thesis"
+    assert queue.lease("worker-1") is None
+
+
+def test_failed_job_retries_with_backoff_then_fails(tmp_path: Path):
+    queue = JobQueue(tmp_path / "jobs.json", max_attempts=2, backoff_seconds=10)
+    queue.enqueue("doc", tmp_path / "doc.md")
+    now = datetime.utcnow()
+
+    queue.lease("worker-1", now=now)
+    retried = queue.fail("doc", "boom", now=now)
+    assert retried.status == JobStatus.QUEUED
+    assert queue.lease("worker-1", now=now + timedelta(seconds=5)) is None
+
+    queue.lease("worker-1", now=now + timedelta(seconds=11))
+    assert queue.fail("doc", "boom again").status == JobStatus.FAILED
+
+
+def test_expired_lease_is_recovered(tmp_path: Path):
+    queue = JobQueue(tmp_path / "jobs.json", lease_seconds=30)
+    queue.enqueue("doc", tmp_path / "doc.md")
+    now = datetime.utcnow()
+    queue.lease("crashed-worker", now=now)
+
+    assert queue.recover(now=now + timedelta(seconds=10)) == []
+    recovered = queue.recover(now=now + timedelta(seconds=31))
+    assert [job.id for job in recovered] == ["doc"]
+    assert queue.get("doc").status == JobStatus.QUEUED
+
+
+def test_expired_leases_count_as_failed_attempts(make_context, add_document):
+    context = make_context(job_max_attempts=3, job_lease_seconds=1)
+    file_path = add_document(context, "crash", "# Crashes its worker")
+    context.jobs.enqueue("crash", file_path)
+    now = datetime.utcnow()
+    attempts = []
+    for _ in range(6):
+        job = context.jobs.lease("doomed-worker", now=now)
+        if job is None:
+            break
+        attempts.append(job.attempts)
+        context.jobs.recover(now=now + timedelta(seconds=2))
+        now += timedelta(hours=1)
+
+    assert attempts == [1, 2, 3]
+    assert context.jobs.get("crash").status == JobStatus.FAILED
+    assert recover_jobs(context) is False
+    record = context.storage.get_record("crash")
+    assert record.status == DocumentStatus.FAILED and "expired" in record.error
+
+
+def test_startup_sweep_resumes_stuck_documents(make_context, add_document):
+    context = make_context()
+    add_document(context)
+
+    assert recover_jobs(context)
+    assert drain_jobs(context) == 1
+    assert context.storage.get_record("doc1").status == DocumentStatus.COMPLETED
+    assert context.jobs.get("doc1").status == JobStatus.COMPLETED
+
+
+def test_stale_holder_cannot_complete_or_fail_a_released_job(tmp_path: Path):
+    queue = JobQueue(tmp_path / "jobs.json", lease_seconds=30)
+    queue.enqueue("doc", tmp_path / "doc.md")
+    now = datetime.utcnow()
+    stale = queue.lease("slow-worker", now=now)
+    assert queue.renew("doc", stale.lease_id, now=now + timedelta(seconds=20))
+    assert queue.recover(now=now + timedelta(seconds=40)) == []
+
+    queue.recover(now=now + timedelta(seconds=51))
+    current = queue.lease("other-worker", now=now + timedelta(seconds=60))
+    assert not queue.renew("doc", stale.lease_id)
+    assert queue.fail("doc", "late failure", lease_id=stale.lease_id) is None
+    queue.complete("doc", lease_id=stale.lease_id)
+    assert queue.get("doc").status == JobStatus.LEASED
+
+    queue.complete("doc", lease_id=current.lease_id)
+    assert queue.get("doc").status == JobStatus.COMPLETED
+
+
+def test_waiting_large_job_is_not_starved(tmp_path: Path):
+    queue = JobQueue(tmp_path / "jobs.json", aging_per_second=100_000)
+    start = datetime.utcnow()
+    queue.enqueue("thesis", tmp_path / "thesis.pdf", priority=50_000_000, now=start)
+    queue.enqueue("abstract-1", tmp_path / "a1.md", priority=2_000, now=start + timedelta(seconds=60))
+    assert queue.lease("worker", now=start + timedelta(seconds=60)).id == "abstract-1"
+
+    queue.enqueue("abstract-2", tmp_path / "a2.md", priority=2_000, now=start + timedelta(seconds=600))
+    assert queue.lease("worker", now=start + timedelta(seconds=600)).id == "thesis"
+
+
+def test_reused_pid_with_new_start_time_is_abandoned():
+    host, pid, start = worker_identity().split(":")
+    assert not _lease_abandoned(worker_identity())
+    if start:
+        assert _lease_abandoned(f"{host}:{pid}:{int(start) + 1}")
+    assert not _lease_abandoned(f"other-host:{os.getpid()}:1")
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from app.config import Settings
+from app.llm import LLMClient, LLMError, ResponseCache, estimate_tokens, get_llm_client, pack_chunks
+from app.workflow.nodes import GlossaryNode, SummaryNode
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.prompts: List[str] = []
+        self.client_ports: set = set()
+        self.fail_next = 0
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubOpenAIServer
+
+    def do_POST(self) -> None:  # noqa: N802
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        stub = self.server
+        with stub.lock:
+            stub.client_ports.add(self.client_address[1])
+            stub.active += 1
+            stub.max_active = max(stub.max_active, stub.active)
+            failing = stub.fail_next > 0
+            stub.fail_next -= 1 if failing else 0
+        time.sleep(stub.delay)
+        prompt = payload["messages"][-1]["content"]
+        with stub.lock:
+            stub.active -= 1
+            stub.prompts.append(prompt)
+        if failing:
+            self._reply(503, {"error": "overloaded"})
+            return
+        self._reply(200, {"choices": [{"message": {"content": f"LLM: {prompt.splitlines()[0][:40]}"}}]})
+
+    def _reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        return None
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubOpenAIServer]:
+    server = StubOpenAIServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_pack_chunks_respects_budget():
+    items = ["word " * 100, "word " * 100, "word " * 100, "word " * 1000]
+    chunks = pack_chunks(items, token_budget=300)
+    assert len(chunks) == 3
+    assert all(estimate_tokens(chunk) <= 300 for chunk in chunks)
+
+
+def test_complete_many_bounds_concurrency_and_reuses_connections(stub_server: StubOpenAIServer):
+    stub_server.delay = 0.05
+    client = LLMClient(stub_server.base_url, "stub-model", max_concurrency=2)
+    prompts = [f"prompt {idx}" for idx in range(8)] + ["prompt 0"]
+    try:
+        results = client.complete_many(prompts)
+    finally:
+        client.close()
+    assert results[0] == results[-1] == "LLM: prompt 0"
+    assert len(stub_server.prompts) == 8
+    assert stub_server.max_active <= 2
+    assert len(stub_server.client_ports) <= 2
+
+
+def test_cache_and_retries(stub_server: StubOpenAIServer, tmp_path: Path):
+    stub_server.fail_next = 2
+    client = LLMClient(stub_server.base_url, "stub-model", backoff_seconds=0.01, cache=ResponseCache(tmp_path))
+    assert client.complete("hello") == "LLM: hello"
+    assert len(stub_server.prompts) == 3
+
+    fresh_client = LLMClient(stub_server.base_url, "stub-model", cache=ResponseCache(tmp_path))
+    assert fresh_client.complete("hello") == "LLM: hello"
+    assert len(stub_server.prompts) == 3
+
+
+def test_exhausted_retries_raise(stub_server: StubOpenAIServer):
+    stub_server.fail_next = 10
+    client = LLMClient(stub_server.base_url, "stub-model", max_retries=1, backoff_seconds=0.01)
+    with pytest.raises(LLMError):
+        client.complete("hello")
+
+
+def test_deadline_clamps_requests_and_stops_batches(stub_server: StubOpenAIServer):
+    stub_server.delay = 1.0
+    client = LLMClient(stub_server.base_url, "stub-model", max_concurrency=1, timeout=30, backoff_seconds=0.01)
+    started = time.perf_counter()
+    with client.deadline(started + 0.3), pytest.raises(LLMError):
+        client.complete_many([f"prompt {idx}" for idx in range(4)])
+    assert time.perf_counter() - started < 0.9
+
+    with client.deadline(time.perf_counter() - 1), pytest.raises(LLMError):
+        client.complete("late prompt")
+    client.close()
+
+
+def test_nodes_use_llm_client(stub_server: StubOpenAIServer):
+    client = LLMClient(stub_server.base_url, "stub-model", context_tokens=1024, max_output_tokens=128)
+    sections = [(f"Part {idx}", "Machine learning improves research outcomes. " * 120) for idx in range(4)]
+
+    summary = SummaryNode(client).run(sections)
+    glossary = GlossaryNode(client).run(sections)
+    client.close()
+
+    assert summary.startswith("LLM: Combine these partial summaries")
+    assert any(prompt.startswith("Summarize the following part") for prompt in stub_server.prompts)
+    assert all(entry.definition.startswith("LLM: Define the term") for entry in glossary)
+
+
+def test_concurrent_documents_share_in_flight_requests(stub_server: StubOpenAIServer):
+    stub_server.delay = 0.2
+    client = LLMClient(stub_server.base_url, "stub-model", max_concurrency=4)
+    results: List[str] = []
+    threads = [threading.Thread(target=lambda: results.append(client.complete("shared prompt"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.close()
+    assert results == ["LLM: shared prompt"] * 3
+    assert stub_server.prompts == ["shared prompt"]
+
+
+def test_client_cache_key_covers_request_settings(tmp_path: Path):
+    base = Settings(storage_path=tmp_path, llm_enabled=True)
+    client = get_llm_client(base)
+    assert get_llm_client(Settings(storage_path=tmp_path, llm_enabled=True)) is client
+    for override in ({"llm_timeout_seconds": 5}, {"llm_max_retries": 0}, {"llm_context_tokens": 8192}):
+        assert get_llm_client(Settings(storage_path=tmp_path, llm_enabled=True, **override)) is not client
@@ -0,0 +1,103 @@
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app.config import Settings
+from app.maintenance import main, run_maintenance
+from app.models import DocumentStatus
+from app.pipeline import ApplicationContext
+
+
+def _age(path: Path, seconds: float) -> None:
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def add_indexed_document(add_document):
+    """An uploaded document of 1000 bytes with a vector, uploaded ``age_hours`` ago; returns its directory."""
+
+    def _add(context: ApplicationContext, doc_id: str, status: DocumentStatus, age_hours: float = 0) -> Path:
+        uploaded_at = datetime.utcnow() - timedelta(hours=age_hours)
+        upload = add_document(context, doc_id, "x" * 1000, status=status, uploaded_at=uploaded_at)
+        context.vectors.upsert(doc_id, [1.0] + [0.0] * 9)
+        return upload.parent
+
+    return _add
+
+
+def test_maintenance_prunes_expired_and_orphaned_state(tmp_path: Path, make_context, add_indexed_document):
+    context = make_context(failed_record_ttl_hours=24)
+    kept = add_indexed_document(context, "a" * 32, DocumentStatus.COMPLETED, age_hours=500)
+    recent_failure = add_indexed_document(context, "b" * 32, DocumentStatus.FAILED, age_hours=1)
+    expired = add_indexed_document(context, "c" * 32, DocumentStatus.FAILED, age_hours=48)
+    context.jobs.enqueue("a" * 32, kept / "paper.md")
+    context.jobs.lease("worker")
+    context.jobs.complete("a" * 32)
+    context.jobs.enqueue("c" * 32, expired / "paper.md")
+
+    orphan = tmp_path / ("d" * 32)
+    orphan.mkdir()
+    (orphan / "paper.md").write_text("orphan", encoding="utf-8")
+    _age(orphan, 7200)
+    fresh_upload = tmp_path / ("e" * 32)
+    fresh_upload.mkdir()
+    stale_tmp = tmp_path / "paperhelper.json.123.456.tmp"
+    stale_tmp.write_text("{}", encoding="utf-8")
+    _age(stale_tmp, 7200)
+
+    report = run_maintenance(context)
+
+    assert report.records_removed == 1 and report.jobs_removed == 2 and report.vectors_removed == 1
+    assert report.orphans_removed == 1 and report.temp_files_removed == 1
+    assert set(context.storage.list_records()) == {"a" * 32, "b" * 32}
+    assert context.jobs.list_jobs() == []
+    assert sorted(context.vectors.ids()) == ["a" * 32, "b" * 32]
+    assert kept.exists() and recent_failure.exists() and fresh_upload.exists()
+    assert not expired.exists() and not orphan.exists() and not stale_tmp.exists()
+    assert "\n" not in (tmp_path / "paperhelper.json").read_text(encoding="utf-8")
+    assert report.bytes_reclaimed >= 1000 + 6 + 2 + context.vectors.row_bytes
+
+
+def test_maintenance_keeps_queued_jobs_of_uploads_it_has_not_seen(tmp_path: Path, make_context, add_indexed_document):
+    context = make_context()
+    context.jobs.enqueue("f" * 32, tmp_path / "paper.md")
+    real_list_jobs = context.jobs.list_jobs
+
+    def list_jobs_then_upload():
+        jobs = real_list_jobs()
+        add_indexed_document(context, "f" * 32, DocumentStatus.PENDING)
+        return jobs
+
+    context.jobs.list_jobs = list_jobs_then_upload
+    report = run_maintenance(context)
+
+    assert report.jobs_removed == 0 and report.vectors_removed == 0
+    assert [job.id for job in real_list_jobs()] == ["f" * 32]
+    assert context.vectors.ids() == ["f" * 32]
+
+
+def test_quota_evicts_least_recently_used_cache_files(tmp_path: Path, make_context):
+    context = make_context()
+    cache = tmp_path / "llm-cache"
+    cache.mkdir()
+    for idx in range(4):
+        entry = cache / f"entry-{idx}.txt"
+        entry.write_bytes(b"x" * 400_000)
+        _age(entry, 1000 - idx * 100)
+
+    report = run_maintenance(context, quota_mb=1)
+
+    assert report.cache_files_evicted == 2
+    assert sorted(path.name for path in cache.iterdir()) == ["entry-2.txt", "entry-3.txt"]
+    assert report.bytes_used <= 1024 * 1024
+    assert run_maintenance(context, quota_mb=0).cache_files_evicted == 0
+
+
+def test_cli_prints_report(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setattr("app.config.get_settings", lambda: Settings(storage_path=tmp_path))
+    assert main(["--quota-mb", "0"]) == 0
+    assert '"bytes_reclaimed"' in capsys.readouterr().out
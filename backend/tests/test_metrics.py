@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+from app.main import app, get_context
+from app.metrics import MetricsRegistry, registry
+from app.models import DocumentStatus
+from app.pipeline import analyze_document
+
+
+def test_registry_renders_prometheus_text():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.describe("jobs_total", "counter", "Jobs seen.")
+    metrics.inc("jobs_total", status="done")
+    metrics.inc("jobs_total", status="done")
+    metrics.observe("latency_seconds", 0.5, stage="summary")
+
+    text = metrics.render()
+    assert "# HELP jobs_total Jobs seen." in text
+    assert 'jobs_total{status="done"} 2' in text
+    assert 'latency_seconds_bucket{stage="summary",le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{stage="summary",le="1"} 1' in text
+    assert 'latency_seconds_count{stage="summary"} 1' in text
+
+
+def test_analysis_records_per_document_timings(make_context, add_document):
+    context = make_context()
+    file_path = add_document(context)
+
+    analyze_document("doc1", file_path, context)
+
+    record = context.storage.get_record("doc1")
+    assert record.status == DocumentStatus.COMPLETED
+    assert "timing.parse_seconds" in record.metadata
+    assert "timing.summary_seconds" in record.metadata
+    assert record.metadata["bytes_processed"] == str(file_path.stat().st_size)
+    assert registry.value("paperhelper_stage_seconds", stage="summary") >= 1
+
+
+def test_metrics_endpoint_exposes_text(make_context):
+    context = make_context()
+    app.dependency_overrides[get_context] = lambda: context
+    try:
+        response = TestClient(app).get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert "# TYPE paperhelper_jobs_in_flight gauge" in response.text
+    assert "paperhelper_jobs_queued 0" in response.text
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import app, get_context
+from app.pipeline import analyze_document
+from app.profiling import PROFILE_FILENAME, PROFILE_REPORT_FILENAME, profile_if_slow
+
+
+def test_profile_discarded_below_threshold(tmp_path: Path):
+    with profile_if_slow(tmp_path, enabled=True, threshold_seconds=60.0) as capture:
+        sum(range(1000))
+    assert capture.path is None
+    assert not (tmp_path / PROFILE_FILENAME).exists()
+
+
+def test_disabled_profiling_writes_nothing(tmp_path: Path, make_context, add_document):
+    context = make_context(profile_enabled=False)
+    add_document(context)
+    analyze_document("doc1", tmp_path / "doc1" / "paper.md", context)
+    assert "profile_path" not in context.storage.get_record("doc1").metadata
+    assert not (tmp_path / "doc1" / PROFILE_FILENAME).exists()
+
+
+def test_requested_profile_is_downloadable(tmp_path: Path, make_context, add_document):
+    context = make_context()
+    add_document(context)
+    analyze_document("doc1", tmp_path / "doc1" / "paper.md", context, profile=True)
+
+    record = context.storage.get_record("doc1")
+    assert record.metadata["profile_path"] == str(tmp_path / "doc1" / PROFILE_FILENAME)
+
+    app.dependency_overrides[get_context] = lambda: context
+    try:
+        client = TestClient(app)
+        response = client.get("/api/admin/documents/doc1/profile")
+        assert response.status_code == 200
+        assert response.content == (tmp_path / "doc1" / PROFILE_FILENAME).read_bytes()
+        report = client.get("/api/admin/documents/doc1/profile", params={"format": "text"})
+        assert "function calls" in report.text
+
+        (tmp_path / "doc1" / PROFILE_REPORT_FILENAME).unlink()
+        assert client.get("/api/admin/documents/doc1/profile", params={"format": "text"}).status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_concurrent_profiles_run_unprofiled_instead_of_failing(tmp_path: Path):
+    with profile_if_slow(tmp_path / "outer", enabled=True, threshold_seconds=0.0) as outer:
+        with profile_if_slow(tmp_path / "inner", enabled=True, threshold_seconds=0.0) as inner:
+            sum(range(1000))
+    assert outer.path == tmp_path / "outer" / PROFILE_FILENAME
+    assert inner.path is None
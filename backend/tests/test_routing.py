@@ -0,0 +1,50 @@
+import pytest
+
+from fastapi import BackgroundTasks, FastAPI
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"item": item_id}
+
+    @app.get("/items/{item_id}/parts/{part}")
+    def get_part(item_id: str, part: str, limit: int = 10):
+        return {"item": item_id, "part": part, "limit": limit}
+
+    @app.get("/items/latest")
+    async def latest():
+        return {"item": "latest"}
+
+    @app.post("/items/{item_id}")
+    async def post_item(item_id: str, background: BackgroundTasks):
+        done = []
+
+        async def mark() -> None:
+            done.append(item_id)
+
+        background.add_task(mark)
+        return done
+
+    return app
+
+
+def test_dispatch_extracts_params_and_prefers_static_segments():
+    app = _build_app()
+    assert app._call_route("GET", "/items/42", {}) == {"item": "42"}
+    assert app._call_route("GET", "/items/latest", {}) == {"item": "latest"}
+    assert app._call_route("GET", "/items/42/parts/gear?limit=3", {}) == {"item": "42", "part": "gear", "limit": 3}
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/items"), ("GET", "/items/42/parts"), ("DELETE", "/items/42")])
+def test_unknown_routes_and_methods_raise_lookup_error(method: str, path: str):
+    with pytest.raises(LookupError):
+        _build_app()._call_route(method, path, {})
+
+
+def test_background_coroutines_finish_on_persistent_loop():
+    app = _build_app()
+    assert app._call_route("POST", "/items/7", {}) == ["7"]
+    assert app._call_route("POST", "/items/8", {}) == ["8"]
@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import app, get_context
+from app.models import DocumentArtifacts, DocumentRecord, GlossaryEntry, MindMap
+from app.pipeline import ApplicationContext, analyze_document
+from app.similarity import VectorIndex, cluster_corpus
+from app.storage import StorageManager
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _unit(axis: int, noise: float = 0.0) -> list:
+    vector = [noise] * 10
+    vector[axis] = 1.0
+    return vector
+
+
+def test_embeddings_are_stable_across_processes():
+    script = "from app.utils import build_embedding; print(build_embedding('neural networks learn representations'))"
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=BACKEND_DIR,
+            env=dict(os.environ, PYTHONHASHSEED=seed),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+
+def test_most_similar_scans_in_blocks_and_upserts_in_place(tmp_path: Path):
+    index = VectorIndex(tmp_path, block_rows=2)
+    index.upsert("a", _unit(0))
+    index.upsert("b", _unit(0, noise=0.1))
+    index.upsert("c", _unit(5))
+    index.upsert("d", _unit(0, noise=0.3))
+    assert [doc_id for doc_id, _ in index.most_similar("a", limit=2)] == ["b", "d"]
+
+    index.upsert("c", _unit(0, noise=0.05))
+    assert index.ids() == ["a", "b", "c", "d"]
+    assert index.most_similar("a", limit=1)[0][0] == "c"
+
+
+def test_scans_read_one_snapshot_while_the_index_changes(tmp_path: Path):
+    index = VectorIndex(tmp_path, block_rows=1)
+    for idx, doc_id in enumerate("abc"):
+        index.upsert(doc_id, _unit(idx))
+    with index.snapshot() as (ids, handle):
+        index.upsert("d", _unit(3))
+        index.remove(["a"])
+        blocks = list(index.iter_blocks(handle, len(ids)))
+    assert ids == ["a", "b", "c"]
+    assert [start for start, _ in blocks] == [0, 1, 2]
+    assert index.ids() == ["b", "c", "d"]
+    assert {doc_id for doc_id, _ in index.most_similar("b", limit=5)} == {"c", "d"}
+
+
+def test_cluster_corpus_groups_and_labels(tmp_path: Path):
+    storage = StorageManager(tmp_path / "paperhelper.json")
+    index = VectorIndex(tmp_path / "vectors", block_rows=3)
+    topics = {"vision": (0, "Convolution Imagery"), "language": (7, "Transformer Tokenizer")}
+    for topic, (axis, terms) in topics.items():
+        for idx in range(4):
+            doc_id = f"{topic}-{idx}"
+            glossary = [GlossaryEntry(term=term, definition="", score=1.0) for term in terms.split()]
+            storage.save_record(
+                DocumentRecord(
+                    id=doc_id,
+                    filename=f"{doc_id}.md",
+                    storage_path=tmp_path / doc_id,
+                    artifacts=DocumentArtifacts(summary="", mind_map=MindMap(), glossary=glossary),
+                )
+            )
+            index.upsert(doc_id, _unit(axis, noise=0.01 * idx))
+
+    result = cluster_corpus(storage, index, tmp_path / "clusters.json", k=2)
+    assignments = result["assignments"]
+    assert len({assignments[f"vision-{idx}"] for idx in range(4)}) == 1
+    assert assignments["vision-0"] != assignments["language-0"]
+    labels = {cluster["label"] for cluster in result["clusters"]}
+    assert any("convolution" in label for label in labels)
+    assert (tmp_path / "clusters.json").exists()
+
+
+def test_similar_endpoint_after_analysis(tmp_path: Path):
+    context = ApplicationContext(Settings(storage_path=tmp_path))
+    texts = {
+        "ml1": "Neural networks learn representations from training data. Gradient descent optimizes networks.",
+        "ml2": "Training neural networks with gradient descent improves learned representations.",
+        "bio": "Protein folding shapes enzyme function inside living cells and tissues.",
+    }
+    for doc_id, text in texts.items():
+        file_path = tmp_path / doc_id / "paper.md"
+        file_path.parent.mkdir()
+        file_path.write_text(text)
+        context.storage.save_record(DocumentRecord(id=doc_id, filename="paper.md", storage_path=file_path))
+        analyze_document(doc_id, file_path, context)
+
+    app.dependency_overrides[get_context] = lambda: context
+    try:
+        client = TestClient(app)
+        response = client.get("/api/documents/ml1/similar", params={"limit": 2})
+        missing = client.get("/api/documents/unknown/similar")
+    finally:
+        app.dependency_overrides.clear()
+    assert [item["id"] for item in response.json()] == ["ml2", "bio"]
+    assert missing.status_code == 404
@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Cold-start budget for importing an entry point in a fresh interpreter. Workers are autoscaled
+# on queue depth, so this guards against heavy dependencies creeping into module import time.
+STARTUP_BUDGET_SECONDS = 1.0
+
+LAZY_MODULES = {"PyPDF2", "numpy", "cProfile", "pstats", "multiprocessing", "http.client", "app.workflow.nodes", "app.llm"}
+
+
+def _import_in_fresh_interpreter(module: str) -> dict:
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps({'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules)}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True, timeout=60
+    )
+    return json.loads(result.stdout)
+
+
+def test_api_import_within_budget_and_lazy():
+    result = _import_in_fresh_interpreter("app.main")
+    assert result["seconds"] < STARTUP_BUDGET_SECONDS
+    assert not LAZY_MODULES & set(result["modules"])
+
+
+def test_worker_import_skips_web_stack():
+    result = _import_in_fresh_interpreter("app.worker")
+    assert result["seconds"] < STARTUP_BUDGET_SECONDS
+    assert "fastapi" not in result["modules"]
+    assert not LAZY_MODULES & set(result["modules"])
+
+
+def test_pdf_upload_does_not_load_parser_in_api(tmp_path: Path):
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from fastapi.testclient import TestClient\n"
+        "from app.config import Settings\n"
+        "from app.main import app, get_context\n"
+        "from app.pipeline import ApplicationContext\n"
+        f"settings = Settings(storage_path=Path({str(tmp_path)!r}), inline_analysis=False)\n"
+        "app.dependency_overrides[get_context] = lambda: ApplicationContext(settings)\n"
+        "response = TestClient(app).post('/api/documents', files={'file': ('paper.pdf', b'%PDF-1.4', 'application/pdf')})\n"
+        "assert response.status_code == 200, response.status_code\n"
+        "print('PyPDF2' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True, timeout=60
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,66 @@
+import re
+from pathlib import Path
+from typing import List
+
+from app.llm import ResponseCache
+from app.utils import _split_into_sections, summarize_sections
+from app.workflow.nodes import SummaryNode
+from app.workflow.summarization import HierarchicalSummarizer, extractive_summarizer
+
+
+def _sections(count: int) -> list:
+    return [(f"Part {idx}", f"Finding number {idx} is important. Details follow here.") for idx in range(count)]
+
+
+def test_tree_depth_and_one_batch_per_level():
+    calls: List[int] = []
+
+    def batch(texts: List[str]) -> List[str]:
+        calls.append(len(texts))
+        return [f"summary of {len(text)} chars" for text in texts]
+
+    summarizer = HierarchicalSummarizer(batch, batch, fan_in=4)
+    assert summarizer.summarize(_sections(20))
+    assert calls == [20, 5, 2, 1]
+    assert summarizer.stats.depth == 3
+
+
+def test_resummarizing_only_recomputes_changed_branch(tmp_path: Path):
+    cache = ResponseCache(tmp_path)
+    sections = _sections(16)
+    first = extractive_summarizer(fan_in=4, cache=cache)
+    first.summarize(sections)
+    assert first.stats.computed == 16 + 4 + 1
+
+    sections[9] = ("Part 9", "A revised finding replaces the old one. New details.")
+    second = extractive_summarizer(fan_in=4, cache=ResponseCache(tmp_path))
+    summary = second.summarize(sections)
+    assert second.stats.computed == 3
+    assert second.stats.cached == 16 + 4 + 1 - 3
+    assert "Finding number 0 is important." in summary
+
+
+def test_hierarchical_mode_uses_tree_for_long_papers():
+    summary = SummaryNode(mode="hierarchical", fan_in=2).run(_sections(8))
+    assert "Finding number 0 is important." in summary
+    assert "Finding number 4 is important." in summary
+
+
+def _paper(sentences: int) -> str:
+    return " ".join(f"Sentence {idx} reports result {idx} about graph models." for idx in range(sentences))
+
+
+def test_offline_auto_mode_stays_flat_on_word_window_chunks(tmp_path: Path):
+    sections = _split_into_sections(_paper(250), chunk_size=400, overlap=50)
+    assert len(sections) > 4
+    node = SummaryNode(mode="auto", fan_in=4, cache=ResponseCache(tmp_path))
+    assert node.run(sections) == summarize_sections(sections)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_extractive_tree_skips_chunk_fragments(tmp_path: Path):
+    sections = _split_into_sections(_paper(250), chunk_size=400, overlap=50)
+    summary = SummaryNode(mode="hierarchical", fan_in=8, cache=ResponseCache(tmp_path)).run(sections)
+    sentences = re.split(r"(?<=[.!?])\s+", summary)
+    assert all(sentence.startswith("Sentence ") for sentence in sentences)
+    assert list(tmp_path.iterdir()) == []
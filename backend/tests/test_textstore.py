@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import app, get_context
+from app.models import DocumentStatus
+from app.pipeline import analyze_document
+from app.textstore import TextStore
+from app.utils import ParsedDocument, _split_into_sections, load_document
+
+TEXT = "# Überblick\nGraph neural networks aggregate features. Each layer mixes neighbours!\n\nCafé results follow."
+
+
+def test_save_and_load_round_trips_sections_and_pages(tmp_path: Path):
+    text = "\n".join(["first page words " * 500, "second page ünïcode " * 700])
+    parsed = ParsedDocument(text=text, sections=_split_into_sections(text), page_offsets=[0, 8501])
+    store = TextStore(tmp_path)
+    index = store.save("doc", parsed)
+
+    assert len(index["sections"]) == len(parsed.sections) > 1
+    assert index["bytes"] == store.size("doc") > len(text)
+    restored = store.load_parsed("doc")
+    assert restored == parsed
+    title, start, end = index["sections"][-1]
+    assert store.read("doc", start, end)[2].split() == parsed.sections[-1][1].split()
+    assert store.read("doc", index["pages"][1], index["pages"][1] + 11)[2] == "second page"
+
+
+def test_read_snaps_to_character_boundaries(tmp_path: Path):
+    store = TextStore(tmp_path)
+    store.save("doc", ParsedDocument(text="aé b", sections=[("a", "aé b")]))
+    assert store.read("doc", 2, 3) == (1, 3, "é")
+    assert store.read("doc", 0, 100) == (0, 5, "aé b")
+    store.save("empty", ParsedDocument(text="", sections=[("Empty", "")]))
+    assert store.read("empty") == (0, 0, "")
+
+
+def test_reanalysis_skips_extraction(make_context, add_document, monkeypatch):
+    context = make_context()
+    path = add_document(context, "doc", TEXT)
+    context.texts.save("doc", load_document(path))
+
+    calls = []
+    monkeypatch.setattr("app.pipeline.load_document", lambda *args: calls.append(args))
+    analyze_document("doc", path, context)
+    assert not calls
+    assert context.storage.get_record("doc").status == DocumentStatus.COMPLETED
+
+
+def test_text_endpoint_serves_snippets(make_context):
+    context = make_context()
+    app.dependency_overrides[get_context] = lambda: context
+    try:
+        client = TestClient(app)
+        response = client.post("/api/documents", files={"file": ("paper.md", TEXT.encode("utf-8"), "text/markdown")})
+        doc_id = response.json()["id"]
+
+        index = client.get(f"/api/documents/{doc_id}/text/index").json()
+        second = index["sentences"][1]
+        snippet = client.get(f"/api/documents/{doc_id}/text", params={"start": second, "end": index["sentences"][2]}).json()
+        assert snippet["text"] == "Each layer mixes neighbours!\n\n"
+        assert snippet["total"] == len(TEXT.encode("utf-8"))
+
+        whole = client.get(f"/api/documents/{doc_id}/text").json()
+        assert whole["text"] == TEXT and whole["end"] == whole["total"]
+        assert client.get(f"/api/documents/{doc_id}/text", params={"start": 5, "end": 2}).status_code == 400
+        assert client.get("/api/documents/missing/text").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
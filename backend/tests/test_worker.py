@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import app, get_context
+from app.models import DocumentStatus
+from app.pipeline import ApplicationContext
+from app.worker import run_worker
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _upload(context: ApplicationContext, tmp_path: Path) -> str:
+    app.dependency_overrides[get_context] = lambda: context
+    try:
+        file_path = tmp_path / "paper.md"
+        file_path.write_text("# Title\nMachine learning improves research outcomes.")
+        with file_path.open("rb") as handle:
+            response = TestClient(app).post("/api/documents", files={"file": ("paper.md", handle, "text/markdown")})
+    finally:
+        app.dependency_overrides.clear()
+    return response.json()["id"]
+
+
+def test_api_only_enqueues_when_inline_analysis_disabled(tmp_path: Path):
+    context = ApplicationContext(Settings(storage_path=tmp_path / "storage", inline_analysis=False))
+    doc_id = _upload(context, tmp_path)
+    assert context.storage.get_record(doc_id).status == DocumentStatus.PROCESSING
+
+    assert run_worker(context, once=True) == 1
+    assert context.storage.get_record(doc_id).status == DocumentStatus.COMPLETED
+
+
+def test_worker_process_completes_queued_job(tmp_path: Path):
+    storage_path = tmp_path / "storage"
+    context = ApplicationContext(Settings(storage_path=storage_path, inline_analysis=False))
+    doc_id = _upload(context, tmp_path)
+
+    env = dict(os.environ, PAPERHELPER_STORAGE_PATH=str(storage_path))
+    subprocess.run([sys.executable, "-m", "app.worker", "--once"], cwd=BACKEND_DIR, env=env, check=True, timeout=60)
+
+    record = context.storage.get_record(doc_id)
+    assert record.status == DocumentStatus.COMPLETED
+    assert record.artifacts.summary